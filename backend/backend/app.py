@@ -10,7 +10,10 @@ from fastapi.exceptions import (
 
 from backend.config.lifespan import lifespan
 from backend.routes.index import router as index
+from backend.routes.metrics import router as metrics
 from backend.utils.pydanticToFormError import pydantic_to_form_error
+from backend.utils.access_log import AccessLogMiddleware
+from backend.config import main as config
 
 logging.basicConfig(level=logging.INFO)
 
@@ -33,12 +36,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.middleware("http")
-async def add_checker(request: Request, call_next):
-    data = await request.body()
-    logging.info(data)
-    return await call_next(request)
+app.add_middleware(
+    AccessLogMiddleware,
+    sample_rate=config.ACCESS_LOG_SAMPLE_RATE,
+    max_body_bytes=config.ACCESS_LOG_BODY_BYTES,
+)
 
 
 @app.exception_handler(Exception)
@@ -67,3 +69,5 @@ async def validation_exception_handler(request: Request, exc: ValidationExceptio
 
 
 app.include_router(prefix="/api", router=index)
+# Scraped by Prometheus, kept outside /api
+app.include_router(router=metrics)
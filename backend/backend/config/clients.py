@@ -0,0 +1,104 @@
+# config/clients.py
+import logging
+import inspect
+
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+from backend.config import main as config
+
+# Process wide clients, created once in `lifespan` and shared by every request
+_clients: dict = {}
+
+
+def init_clients() -> dict:
+    """
+    Creates the shared Gemini chat / embedding clients and, when Astra DB is the
+    configured vector store, the Data API client and its collection handle.
+    Each client keeps its own pooled gRPC channel / HTTP connections alive.
+    """
+    if _clients:
+        return _clients
+
+    _clients["llm"] = ChatGoogleGenerativeAI(
+        model=config.GEMINI_MODEL, google_api_key=config.GEMINI_API_KEY
+    )
+    if config.EMBEDDING_BACKEND == "local":
+        from backend.utils.embeddings import LocalEmbeddings
+
+        _clients["embeddings"] = LocalEmbeddings()
+    else:
+        _clients["embeddings"] = GoogleGenerativeAIEmbeddings(
+            model=config.EMBEDDING_MODEL, google_api_key=config.GEMINI_API_KEY
+        )
+
+    if config.VECTOR_STORE_BACKEND == "astra":
+        _connect_astra(_clients)
+
+    return _clients
+
+
+def _connect_astra(clients: dict) -> None:
+    from astrapy import DataAPIClient
+
+    clients["astra"] = DataAPIClient(config.ASTRA_DB_SECRET_KEY)
+    db = clients["astra"].get_database_by_api_endpoint(
+        config.ASTRA_DB_ENDPOINT, keyspace=config.ASTRA_DB_KEYSPACE
+    )
+    clients["collection"] = db.get_collection("embeddings")
+    clients["async_collection"] = clients["collection"].to_async()
+
+
+def get_llm() -> ChatGoogleGenerativeAI:
+    return init_clients()["llm"]
+
+
+def get_embedding_model() -> GoogleGenerativeAIEmbeddings:
+    return init_clients()["embeddings"]
+
+
+def get_astra_collection():
+    clients = init_clients()
+    if "collection" not in clients:
+        _connect_astra(clients)
+    return clients["collection"]
+
+
+def get_async_astra_collection():
+    get_astra_collection()
+    return _clients["async_collection"]
+
+
+async def _close_quietly(name: str, close) -> None:
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logging.warning(f"Failed to close {name} client: {e}")
+
+
+async def close_clients() -> None:
+    """
+    Closes the pooled channels / connections opened by `init_clients`.
+    """
+    llm = _clients.get("llm")
+    if isinstance(llm, ChatGoogleGenerativeAI):
+        await _close_quietly("llm", lambda: llm.client.transport.close())
+        if llm.async_client_running is not None:
+            await _close_quietly(
+                "llm async", lambda: llm.async_client_running.transport.close()
+            )
+
+    embeddings = _clients.get("embeddings")
+    if isinstance(embeddings, GoogleGenerativeAIEmbeddings):
+        await _close_quietly("embeddings", lambda: embeddings.client.transport.close())
+
+    # The sync collection has nothing of its own to close: astrapy shares one
+    # HTTP client between all sync handles for the life of the process
+    async_collection = _clients.get("async_collection")
+    if async_collection is not None:
+        await _close_quietly(
+            "astra async", lambda: async_collection.__aexit__(None, None, None)
+        )
+
+    _clients.clear()
@@ -4,21 +4,54 @@ from fastapi import FastAPI
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 
-from backend.config.main import MONGO_URI
+from backend.config.main import MONGO_URI, CHECK_QUERY_PLANS, REGISTRY_EXACT_MATCH
 import logging
 
 from backend.models.User import User
 from backend.models.Token import Token
 from backend.models.ReportHistory import ReportHistory
+from backend.models.BatchReport import BatchReport
+from backend.utils.query_plans import check_query_plans
+from backend.config.clients import init_clients, close_clients
+from backend.utils.vector_store import init_vector_store
+from backend.utils.registry_index import init_registry_index
+from backend.controller.graphs import init_graphs
+from backend.controller import jobs
+from backend.controller.agent import requeue_unfinished_reports
+from backend.controller.batch import process_job, requeue_unfinished_batches
+from backend.utils.file_reader import shutdown_file_reader
+from backend.security.password import shutdown_password_pool
+from backend.utils.access_log import start_access_log, stop_access_log
+from backend.security.session_cache import init_session_cache, close_session_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_access_log()
     app.db = AsyncIOMotorClient(MONGO_URI)["agentic-ai-hackathon"]
     await init_beanie(
         database=app.db,
-        document_models=[User, Token, ReportHistory],
+        document_models=[User, Token, ReportHistory, BatchReport],
     )
     logging.info("Database initialized")
+    if CHECK_QUERY_PLANS:
+        await check_query_plans()
+    init_clients()
+    init_session_cache()
+    app.vector_store = init_vector_store()
+    logging.info(f"Vector store initialized ({len(app.vector_store)} records)")
+    if REGISTRY_EXACT_MATCH:
+        init_registry_index()
+    app.graphs = init_graphs()
+    jobs.start_workers(process_job)
+    await requeue_unfinished_reports()
+    await requeue_unfinished_batches()
     yield
+    await jobs.stop_workers()
+    await close_clients()
+    await close_session_cache()
+    shutdown_file_reader()
+    shutdown_password_pool()
+    app.db.client.close()
     logging.info("Server closed successfully")
+    stop_access_log()
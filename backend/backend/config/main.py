@@ -22,10 +22,158 @@ JWT_REFRESH_KEY = config.get("JWT_REFRESH_KEY", cast=str)
 
 SECRET_OR_KEY = config.get("SECRET_OR_KEY", cast=str)
 
+# Refuse to start when a hot query's explain() shows a collection scan
+CHECK_QUERY_PLANS = config.get("CHECK_QUERY_PLANS", default=True, cast=bool)
+
+# Share of requests written to the access log (server errors are always
+# logged) and the largest JSON request body captured with them, 0 disables
+ACCESS_LOG_SAMPLE_RATE = config.get("ACCESS_LOG_SAMPLE_RATE", default=1.0, cast=float)
+ACCESS_LOG_BODY_BYTES = config.get("ACCESS_LOG_BODY_BYTES", default=0, cast=int)
+
+# bcrypt cost factor for new hashes, and the pool that runs hash / check calls
+BCRYPT_ROUNDS = config.get("BCRYPT_ROUNDS", default=12, cast=int)
+PASSWORD_HASH_WORKERS = config.get(
+    "PASSWORD_HASH_WORKERS", default=min(4, os.cpu_count() or 1), cast=int
+)
+PASSWORD_HASH_QUEUE_SIZE = config.get("PASSWORD_HASH_QUEUE_SIZE", default=64, cast=int)
+
+# Verified sessions are cached for at most SESSION_CACHE_TTL seconds (and never
+# past the token expiry). "memory" is per process, "redis" is shared by workers
+SESSION_CACHE_BACKEND = config.get("SESSION_CACHE_BACKEND", default="memory")
+SESSION_CACHE_ITEMS = config.get("SESSION_CACHE_ITEMS", default=10000, cast=int)
+SESSION_CACHE_TTL = config.get("SESSION_CACHE_TTL", default=300, cast=int)
+REDIS_URL = config.get("REDIS_URL", default="redis://localhost:6379/0")
+
 STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "store")
+MOCK_DIR = os.path.join(os.path.dirname(__file__), "..", "mock")
+
+REGISTRY_FILE_PATHS = [
+    os.path.join(MOCK_DIR, "board_certificate_data.json"),
+    os.path.join(MOCK_DIR, "degree_certificate_data.json"),
+    os.path.join(MOCK_DIR, "medical_licence_data.json"),
+    os.path.join(MOCK_DIR, "training_certificate_data.json"),
+]
+
+# "numpy" keeps the registry index in-process, "astra" queries Astra DB
+VECTOR_STORE_BACKEND = config.get("VECTOR_STORE_BACKEND", default="numpy")
+VECTOR_STORE_PATH = config.get(
+    "VECTOR_STORE_PATH", default=os.path.join(STORE_DIR, "registry_index")
+)
+
+# Decide verification without the LLM when the extracted identifier, name and
+# issue date resolve to exactly one registry record
+REGISTRY_EXACT_MATCH = config.get("REGISTRY_EXACT_MATCH", default=True, cast=bool)
+
+# Verify against the classifier's best registry hit (searched with the raw
+# document text) instead of a second search with the extracted fields
+VERIFIER_REUSE_CLASSIFIER_MATCH = config.get(
+    "VERIFIER_REUSE_CLASSIFIER_MATCH", default=False, cast=bool
+)
+
+# Classify the credential and extract its fields in one structured-output call
+# instead of two; the two-call path remains the fallback when it fails
+CLASSIFY_EXTRACT_SINGLE_PASS = config.get(
+    "CLASSIFY_EXTRACT_SINGLE_PASS", default=False, cast=bool
+)
+
+# Cross-check fields locally: a similarity of at least MATCH is a match, below
+# MISMATCH a mismatch; the LLM is only asked about scores in between
+CROSSCHECK_LOCAL_MATCH = config.get("CROSSCHECK_LOCAL_MATCH", default=True, cast=bool)
+CROSSCHECK_MATCH_SCORE = config.get("CROSSCHECK_MATCH_SCORE", default=0.85, cast=float)
+CROSSCHECK_MISMATCH_SCORE = config.get("CROSSCHECK_MISMATCH_SCORE", default=0.6, cast=float)
 
-ASTRA_DB_SECRET_KEY = config.get("ASTRA_DB_SECRET_KEY", cast=str)
-ASTRA_DB_ENDPOINT = config.get("ASTRA_DB_ENDPOINT", cast=str)
-ASTRA_DB_KEYSPACE  = config.get("ASTRA_DB_KEYSPACE", cast=str)
+# LLM responses cached by model + normalized prompt, in memory and on disk.
+# LLM_CACHE_TTL applies to every agent without an "agent=seconds" override in
+# LLM_CACHE_AGENT_TTLS; a TTL of 0 sends that agent's prompts upstream every time.
+LLM_CACHE_ITEMS = config.get("LLM_CACHE_ITEMS", default=2048, cast=int)
+LLM_CACHE_DIR = config.get("LLM_CACHE_DIR", default=os.path.join(STORE_DIR, "cache", "llm"))
+LLM_CACHE_MAX_BYTES = config.get("LLM_CACHE_MAX_BYTES", default=64 * 1024 * 1024, cast=int)
+LLM_CACHE_TTL = config.get("LLM_CACHE_TTL", default=86400, cast=int)
+LLM_CACHE_AGENT_TTLS = config.get(
+    "LLM_CACHE_AGENT_TTLS",
+    default="classifier=604800,extractor=604800",
+    cast=lambda value: {
+        agent.strip(): int(ttl)
+        for agent, ttl in (pair.split("=") for pair in value.split(",") if pair.strip())
+    },
+)
+
+# Threads available for OCR / PDF text extraction
+FILE_READER_WORKERS = config.get(
+    "FILE_READER_WORKERS", default=min(4, os.cpu_count() or 1), cast=int
+)
+
+# PDFs: pages read at most, worker processes used once a document has at least
+# PDF_PARALLEL_MIN_PAGES pages, and OCR of pages with less text than
+# PDF_OCR_MIN_CHARS that carry an image (scans)
+PDF_MAX_PAGES = config.get("PDF_MAX_PAGES", default=50, cast=int)
+PDF_WORKERS = config.get("PDF_WORKERS", default=min(4, os.cpu_count() or 1), cast=int)
+PDF_PARALLEL_MIN_PAGES = config.get("PDF_PARALLEL_MIN_PAGES", default=8, cast=int)
+PDF_OCR_MIN_CHARS = config.get("PDF_OCR_MIN_CHARS", default=10, cast=int)
+PDF_OCR_DPI = config.get("PDF_OCR_DPI", default=200, cast=int)
+
+# OCR: concurrent Tesseract runs, longest image side kept, deskew search range
+# (degrees, 0 disables), page segmentation mode and the per-document budget
+OCR_WORKERS = config.get("OCR_WORKERS", default=min(4, os.cpu_count() or 1), cast=int)
+OCR_MAX_SIDE = config.get("OCR_MAX_SIDE", default=2000, cast=int)
+OCR_DESKEW_MAX_ANGLE = config.get("OCR_DESKEW_MAX_ANGLE", default=5.0, cast=float)
+OCR_PSM = config.get("OCR_PSM", default=3, cast=int)
+OCR_LANG = config.get("OCR_LANG", default="eng")
+OCR_TIMEOUT = config.get("OCR_TIMEOUT", default=30, cast=float)
+
+# Extracted document text cache, set TEXT_CACHE_MAX_BYTES=0 to keep it in memory only
+TEXT_CACHE_MEMORY_ITEMS = config.get("TEXT_CACHE_MEMORY_ITEMS", default=256, cast=int)
+TEXT_CACHE_DIR = config.get(
+    "TEXT_CACHE_DIR", default=os.path.join(STORE_DIR, "cache", "text")
+)
+TEXT_CACHE_MAX_BYTES = config.get(
+    "TEXT_CACHE_MAX_BYTES", default=256 * 1024 * 1024, cast=int
+)
+
+# Report history page size: default and upper bound for `limit`
+REPORT_PAGE_SIZE = config.get("REPORT_PAGE_SIZE", default=20, cast=int)
+REPORT_PAGE_MAX = config.get("REPORT_PAGE_MAX", default=100, cast=int)
+
+# Uploads are streamed in chunks and rejected once they pass the limit
+MAX_UPLOAD_BYTES = config.get("MAX_UPLOAD_BYTES", default=20 * 1024 * 1024, cast=int)
+UPLOAD_CHUNK_SIZE = config.get("UPLOAD_CHUNK_SIZE", default=1024 * 1024, cast=int)
+# Uploads up to this size stay in memory for the queued job, larger ones are
+# read back from the store
+UPLOAD_INLINE_BYTES = config.get("UPLOAD_INLINE_BYTES", default=8 * 1024 * 1024, cast=int)
+
+# Background report workers and how many queued reports they accept
+JOB_WORKERS = config.get("JOB_WORKERS", default=4, cast=int)
+JOB_QUEUE_SIZE = config.get("JOB_QUEUE_SIZE", default=100, cast=int)
+
+# Batch verification: credentials per practitioner, credentials run at once
+# within a batch, and limits on what a ZIP upload may expand to
+BATCH_MAX_DOCUMENTS = config.get("BATCH_MAX_DOCUMENTS", default=50, cast=int)
+BATCH_CONCURRENCY = config.get("BATCH_CONCURRENCY", default=8, cast=int)
+BATCH_ARCHIVE_MAX_FILES = config.get("BATCH_ARCHIVE_MAX_FILES", default=1000, cast=int)
+BATCH_ARCHIVE_MAX_BYTES = config.get(
+    "BATCH_ARCHIVE_MAX_BYTES", default=500 * 1024 * 1024, cast=int
+)
+
+ASTRA_DB_SECRET_KEY = config.get("ASTRA_DB_SECRET_KEY", default="", cast=str)
+ASTRA_DB_ENDPOINT = config.get("ASTRA_DB_ENDPOINT", default="", cast=str)
+ASTRA_DB_KEYSPACE  = config.get("ASTRA_DB_KEYSPACE", default="", cast=str)
 GEMINI_API_KEY = config.get("GEMINI_API_KEY", cast=str)
+GEMINI_MODEL = config.get("GEMINI_MODEL", default="gemini-1.5-flash-latest")
+
+# "google" calls the Gemini embedding API, "local" is a deterministic offline backend
+EMBEDDING_BACKEND = config.get("EMBEDDING_BACKEND", default="google")
+EMBEDDING_MODEL = config.get("EMBEDDING_MODEL", default="models/embedding-001")
+EMBEDDING_CACHE_ITEMS = config.get("EMBEDDING_CACHE_ITEMS", default=4096, cast=int)
+EMBEDDING_CACHE_TTL = config.get("EMBEDDING_CACHE_TTL", default=86400, cast=int)
+# Leave empty to keep the embedding cache in memory only
+EMBEDDING_CACHE_DIR = config.get(
+    "EMBEDDING_CACHE_DIR", default=os.path.join(STORE_DIR, "cache", "embeddings")
+)
+EMBEDDING_CACHE_MAX_BYTES = config.get(
+    "EMBEDDING_CACHE_MAX_BYTES", default=128 * 1024 * 1024, cast=int
+)
+EMBEDDING_BATCH_SIZE = config.get("EMBEDDING_BATCH_SIZE", default=32, cast=int)
+EMBEDDING_BATCH_WINDOW_MS = config.get(
+    "EMBEDDING_BATCH_WINDOW_MS", default=10, cast=int
+)
 
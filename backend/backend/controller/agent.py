@@ -1,16 +1,20 @@
-from astrapy import DataAPIClient
-import os
-from pathlib import Path
-import json
+import time
+import inspect
+import logging
+from datetime import datetime
 from beanie import PydanticObjectId
 from langgraph.graph import StateGraph, END, START
 from langchain_core.runnables import RunnableLambda
-from typing import TypedDict
+from typing import TypedDict, Annotated, Optional
 
 from backend.config import main as config
-from backend.utils.embeddings import get_text_embedding
+from backend.constants.enums import ReportStatus
+from backend.controller import jobs
 from backend.utils.generate_random_string import generate_random_string
 from backend.models.ReportHistory import ReportHistory
+from backend.controller.graphs import register_graph, get_graph
+from backend.utils.metrics import node_seconds, report_submissions, start_run
+from backend.utils.vector_store import registry_version
 
 from backend.controller.agents.classifier_agent import classify_file as classifier_agent
 from backend.controller.agents.credential_agent import (
@@ -21,100 +25,226 @@ from backend.controller.agents.verification_agent import (
 )
 from backend.controller.agents.crosscheck_agent import (
     cross_check_all as crosscheck_agent,
+    read_resume as resume_reader,
 )
 from backend.controller.agents.credibility_agent import (
     evaluate_credibility as credibility_agent,
 )
 
-file_paths = [
-    os.path.join(
-        os.path.dirname(__file__), "..", "mock", "board_certificate_data.json"
-    ),
-    os.path.join(
-        os.path.dirname(__file__), "..", "mock", "degree_certificate_data.json"
-    ),
-    os.path.join(os.path.dirname(__file__), "..", "mock", "medical_licence_data.json"),
-    os.path.join(
-        os.path.dirname(__file__), "..", "mock", "training_certificate_data.json"
-    ),
-]
-
-
-async def create_vector_store() -> None:
-    client = DataAPIClient(config.ASTRA_DB_SECRET_KEY)
-
-    db = client.get_database_by_api_endpoint(
-        config.ASTRA_DB_ENDPOINT,
-        keyspace=config.ASTRA_DB_KEYSPACE,
-    )
-
-    collection = db.get_collection("embeddings")
-
-    for file_path in file_paths:
-        if not Path(file_path).exists():
-            print(f"File not found: {file_path}")
-            continue
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            records = json.load(f)
+# Newest first, so a resubmission picks up the latest report
+PREVIOUS_REPORT_SORT = [("_id", -1)]
 
-        for record in records:
-            text = json.dumps(record, ensure_ascii=False)
-            doc_id = (
-                record.get("certificate_id")
-                or record.get("registration_number")
-                or record.get("id")
-                or record.get("license_number")
-            )
 
-            if not doc_id:
-                # Use a fallback ID if needed
-                doc_id = f"{hash(text)}"
+def previous_report_query(user_id, hashes: dict) -> dict:
+    return {
+        "user_id": user_id,
+        **hashes,
+        "status": {
+            "$in": [
+                ReportStatus.PENDING.value,
+                ReportStatus.PROCESSING.value,
+                ReportStatus.COMPLETED.value,
+            ]
+        },
+    }
 
-            # Create embedding vector
-            embedding = get_text_embedding(text)
 
-            astra_doc = {
-                "id": doc_id,
-                "text": text,
-                "$vector": embedding,
-            }
+async def find_previous_report(user_id, hashes: dict) -> Optional[ReportHistory]:
+    """
+    Newest report of this user for the same files and registry version that
+    is completed or still on its way.
+    """
+    return await ReportHistory.find(
+        previous_report_query(user_id, hashes),
+        sort=PREVIOUS_REPORT_SORT,
+        limit=1,
+    ).first_or_none()
 
-            # Insert or update (upsert=True ensures no duplicates)
-            collection.update_one({"id": doc_id}, {"$set": astra_doc}, upsert=True)
 
+async def reuse_report(previous: ReportHistory, curr_user, hashes: dict) -> ReportHistory:
+    # A double submission joins the run in progress
+    if previous.status != ReportStatus.COMPLETED:
+        report_submissions.inc(outcome="in_progress")
+        return previous
 
-async def run_agent(file_paths: dict[str, str], curr_user) -> dict:
+    # A resubmission gets its own history entry with the earlier result
+    report_submissions.inc(outcome="reused")
+    clone = ReportHistory(
+        user_id=curr_user.user_id,
+        report_id=generate_random_string(7),
+        credential_type=previous.credential_type,
+        credential_path=previous.credential_path,
+        validator_type=previous.validator_type,
+        validator_path=previous.validator_path,
+        result=previous.result,
+        status=ReportStatus.COMPLETED,
+        reused_from=previous.reused_from or previous.report_id,
+        **hashes,
+    )
+    await clone.insert()
+    return clone
+
+
+async def run_agent(
+    file_paths: dict[str, str],
+    curr_user,
+    uploads: Optional[dict] = None,
+    force: bool = False,
+) -> ReportHistory:
+    """
+    Queues a report for the credential / resume pair, or hands back the
+    report of an identical earlier submission unless `force` is set.
+    """
+    uploads = uploads or {}
+    hashes = {
+        "credential_sha256": (uploads.get("credential_path") or {}).get("sha256"),
+        "resume_sha256": (uploads.get("resume_path") or {}).get("sha256"),
+        "registry_version": registry_version(),
+    }
 
-    # await create_vector_store() # Commenting out to avoid re-creating the vector store every time because its stored on astra db
+    if not force and hashes["credential_sha256"] and hashes["resume_sha256"]:
+        previous = await find_previous_report(curr_user.user_id, hashes)
+        if previous is not None:
+            return await reuse_report(previous, curr_user, hashes)
 
-    state_result = await orchestrator(file_paths=file_paths)
-    result = state_result["formatted_response"]
+    # Reject before writing anything when the workers are saturated
+    if not jobs.has_capacity():
+        raise jobs.QueueFullError("Report queue is full")
 
+    report_submissions.inc(outcome="new")
     historical_entry = ReportHistory(
         user_id=curr_user.user_id,
         report_id=generate_random_string(7),
-        credential_type=result["classifier_result"],
+        credential_type="",
         credential_path=file_paths["credential_path"],
         validator_type="resume",
         validator_path=file_paths["resume_path"],
-        result=result,
-        status="completed",
+        result={},
+        status=ReportStatus.PENDING,
+        **hashes,
     )
 
     await historical_entry.save()
 
-    return result
+    try:
+        jobs.enqueue({"report": historical_entry, "uploads": uploads})
+    except jobs.QueueFullError:
+        await update_report(historical_entry, status=ReportStatus.FAILED)
+        raise
+
+    return historical_entry
+
+
+async def update_report(report: ReportHistory, **fields) -> None:
+    for field, value in fields.items():
+        setattr(report, field, value)
+    report.updated_at = datetime.utcnow()
+    await report.save()
+
+
+async def process_report(job: dict) -> None:
+    """
+    Worker side of `run_agent`: moves the report through PROCESSING to
+    COMPLETED or FAILED.
+    """
+    report = job["report"]
+    await update_report(report, status=ReportStatus.PROCESSING)
+
+    try:
+        state_result = await orchestrator(
+            file_paths={
+                "credential_path": report.credential_path,
+                "resume_path": report.validator_path,
+            },
+            uploads=job.get("uploads"),
+            resume_text=job.get("resume_text"),
+            credential_context=job.get("credential_context"),
+        )
+        result = state_result["formatted_response"]
+        timings = state_result["timings"]
+    except Exception as e:
+        logging.exception(f"Report {report.report_id} failed")
+        await update_report(
+            report, status=ReportStatus.FAILED, result={"error": str(e)}
+        )
+        return
+
+    await update_report(
+        report,
+        credential_type=result["classifier_result"],
+        result=result,
+        timings=timings,
+        status=ReportStatus.COMPLETED,
+    )
+
+
+async def requeue_unfinished_reports() -> None:
+    """
+    Jobs live in memory, so reports left pending / processing by a previous
+    process are queued again, or failed when there is no room for them.
+    """
+    # Batch documents are requeued with their batch
+    unfinished = await ReportHistory.find(
+        {
+            "status": {"$in": [ReportStatus.PENDING.value, ReportStatus.PROCESSING.value]},
+            "batch_id": None,
+        }
+    ).to_list()
+
+    for report in unfinished:
+        if not jobs.has_capacity():
+            await update_report(report, status=ReportStatus.FAILED)
+            continue
+
+        # The upload bytes are gone with the old process, read from the store
+        await update_report(report, status=ReportStatus.PENDING)
+        jobs.enqueue({"report": report})
+
+
+def merge_timings(left: dict, right: dict) -> dict:
+    return {**left, **right}
 
 
 class OrchestratorState(TypedDict):
     file_paths: dict[str, str]
+    # Upload bytes / hashes keyed like file_paths, when still in memory
+    uploads: dict[str, dict]
+    # Batch runs: file_content / context / matches of the credential, prefetched
+    credential_context: dict
+    started_at: float
+    resume_text: str
     classifier_result: dict
     credential_result: dict
     verifier_result: dict
     crosscheck_result: dict
     credebility_result: dict
     formatted_response: dict
+    # Parallel branches write to this concurrently, hence the reducer
+    timings: Annotated[dict, merge_timings]
+
+
+def timed(name: str, node):
+    """
+    Wraps a graph node so it records when it started (relative to the run)
+    and how long it took under `timings[name]`.
+    """
+
+    async def run(state: OrchestratorState) -> dict:
+        start = time.perf_counter()
+        update = node(state)
+        if inspect.isawaitable(update):
+            update = await update
+        end = time.perf_counter()
+        node_seconds.observe(end - start, node=name)
+
+        timing = {
+            "start": round(start - state["started_at"], 4),
+            "duration": round(end - start, 4),
+        }
+        return {**update, "timings": {name: timing}}
+
+    return run
 
 
 def response_formatter(state: OrchestratorState) -> dict:
@@ -139,36 +269,71 @@ def response_formatter(state: OrchestratorState) -> dict:
 
 
 def route_classification(state: dict) -> str:
-    doc_type = state.get("classifier_result", {}).get("type")
-    return "FORMATTER" if doc_type == "not_a_valid_credential" else "EXTRACTOR"
+    doc_type = state.get("classifier_result", {}).get("document_type")
+    if doc_type == "not_a_valid_credential":
+        return "FORMATTER"
+    # Single-pass classification already extracted the fields
+    return "VERIFIER" if "credential_result" in state else "EXTRACTOR"
 
 
 def orchestrator_agent():
     graph = StateGraph(OrchestratorState)
-    graph.add_node("CLASSIFIER", classifier_agent)
-    graph.add_node("ROUTE", route_classification)
-    graph.add_node("EXTRACTOR", extractor_agent)
-    graph.add_node("VERIFIER", verifier_agent)
-    graph.add_node("CROSSCHECK", crosscheck_agent)
-    graph.add_node("EVALUATOR", credibility_agent)
-    graph.add_node("FORMATTER", response_formatter)
-
-    graph.set_entry_point("CLASSIFIER")
+    graph.add_node("CLASSIFIER", timed("CLASSIFIER", classifier_agent))
+    graph.add_node("RESUME", timed("RESUME", resume_reader))
+    graph.add_node("EXTRACTOR", timed("EXTRACTOR", extractor_agent))
+    graph.add_node("VERIFIER", timed("VERIFIER", verifier_agent))
+    graph.add_node("CROSSCHECK", timed("CROSSCHECK", crosscheck_agent))
+    graph.add_node("EVALUATOR", timed("EVALUATOR", credibility_agent))
+    graph.add_node("FORMATTER", timed("FORMATTER", response_formatter))
+
+    # Resume ingestion does not depend on the credential, start it right away
     graph.add_edge(START, "CLASSIFIER")
+    graph.add_edge(START, "RESUME")
 
-    graph.add_conditional_edges("CLASSIFIER", route_classification)
+    graph.add_conditional_edges(
+        "CLASSIFIER", route_classification, ["EXTRACTOR", "VERIFIER", "FORMATTER"]
+    )
 
     graph.add_edge("EXTRACTOR", "VERIFIER")
-    graph.add_edge("VERIFIER", "CROSSCHECK")
+    # Cross-check waits for both the verification and the parsed resume
+    graph.add_edge(["VERIFIER", "RESUME"], "CROSSCHECK")
     graph.add_edge("CROSSCHECK", "EVALUATOR")
     graph.add_edge("EVALUATOR", "FORMATTER")
     graph.add_edge("FORMATTER", END)
 
-    graph.set_finish_point("FORMATTER")
-
     return graph.compile()
 
 
-async def orchestrator(file_paths: dict[str, str]) -> dict:
-    graph = orchestrator_agent()
-    return await graph.ainvoke({"file_paths": file_paths})
+register_graph("orchestrator", orchestrator_agent)
+
+
+async def orchestrator(
+    file_paths: dict[str, str],
+    uploads: Optional[dict] = None,
+    resume_text: Optional[str] = None,
+    credential_context: Optional[dict] = None,
+) -> dict:
+    graph = get_graph("orchestrator")
+    # Inner steps, LLM usage, retrieval and OCR time of this run collect here
+    stats = start_run()
+    started_at = time.perf_counter()
+    state = {
+        "file_paths": file_paths,
+        "uploads": uploads or {},
+        "credential_context": credential_context or {},
+        "started_at": started_at,
+        "timings": {},
+    }
+    if resume_text is not None:
+        state["resume_text"] = resume_text
+    result = await graph.ainvoke(state)
+
+    timings = result.get("timings", {})
+    total = time.perf_counter() - started_at
+    busy = sum(t["duration"] for t in timings.values())
+    logging.info(
+        f"Orchestrator finished in {total:.3f}s ({busy:.3f}s of node time): {timings}"
+    )
+
+    result["timings"] = {"total": round(total, 4), "nodes": timings, **stats}
+    return result
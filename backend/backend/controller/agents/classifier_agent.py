@@ -1,13 +1,18 @@
 # agents/classifier_agent.py
 
 import chardet
-from typing import TypedDict, Literal
+import logging
+from typing import TypedDict, Literal, Optional
+from pydantic import BaseModel, Field, TypeAdapter
 from langgraph.graph import StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
-from astrapy import DataAPIClient
+from backend.controller.graphs import register_graph, get_graph
 import os
-from backend.utils.embeddings import get_text_embedding
-from backend.utils.file_reader import read_file_safely
+from backend.utils.embeddings import aget_text_embedding
+from backend.utils.file_reader import aread_upload
+from backend.utils.vector_store import get_vector_store
+from backend.controller.agents.credential_agent import CredentialFields
+from backend.utils.llm_cache import cached_ainvoke, cached_astructured
+from backend.utils.metrics import instrument, track_retrieval
 from backend.config import main as config
 
 # Document type categories
@@ -19,35 +24,63 @@ Categories = Literal[
 # State definition
 class ClassifierState(TypedDict):
     file_path: str
+    file_data: Optional[bytes]
+    file_hash: Optional[str]
     document_type: Categories
     file_content: str
     context: str
+    matches: list
+    # Single-pass mode: the credential fields, extracted along with the type
+    extracted: CredentialFields
 
 
-def embed_and_search(state: ClassifierState) -> dict:
+class ClassifiedCredential(BaseModel):
+    """
+    Structured output of the single-pass classify + extract call.
+    """
+
+    document_type: Categories
+    name: Optional[str] = Field(None, description="Name of the medical professional")
+    license_number: Optional[str] = Field(None, description="License / registration number")
+    issue_date: Optional[str] = Field(None, description="Issue date")
+    expiry_date: Optional[str] = Field(None, description="Expiry date, if available")
+    institution: Optional[str] = Field(None, description="Institution name")
+    certifying_body: Optional[str] = Field(
+        None, description="Certifying body (e.g., MCI, NMC, GMC)"
+    )
+
+
+_credential_fields = TypeAdapter(CredentialFields)
+
+
+def similar_context(results: list) -> str:
+    return "\n---\n".join(r["text"] for r in results if "text" in r)
+
+
+async def embed_and_search(state: ClassifierState) -> dict:
+    # Batch runs read, embed and search all their credentials up front
+    if state.get("matches") is not None:
+        return state
+
     file_path = state["file_path"]
 
     try:
-        content = read_file_safely(file_path)
+        content = await aread_upload(
+            file_path, state.get("file_data"), state.get("file_hash")
+        )
     except Exception as e:
         raise ValueError(f"Failed to read file: {file_path}. Reason: {e}")
 
-    embedding = get_text_embedding(content)
-
-    client = DataAPIClient(config.ASTRA_DB_SECRET_KEY)
-    db = client.get_database_by_api_endpoint(
-        config.ASTRA_DB_ENDPOINT, keyspace=config.ASTRA_DB_KEYSPACE
-    )
-    collection = db.get_collection("embeddings")
-
-    results = collection.find({}, sort={"$vector": embedding}, limit=5)
-    similar_context = "\n---\n".join(r["text"] for r in results if "text" in r)
+    embedding = await aget_text_embedding(content)
 
+    with track_retrieval("classifier"):
+        results = await get_vector_store().asearch(embedding, limit=5)
     new_state = dict(state)
     new_state.update(
         {
             "file_content": content,
-            "context": similar_context,
+            "context": similar_context(results),
+            "matches": results,
         }
     )
 
@@ -55,15 +88,11 @@ def embed_and_search(state: ClassifierState) -> dict:
 
 
 # Step 2: Classify document type using Gemini
-def classify_document(state: dict) -> ClassifierState:
+async def classify_document(state: dict) -> ClassifierState:
 
     content = state["file_content"]
     context = state["context"]
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest", google_api_key=config.GEMINI_API_KEY
-    )
-
     prompt = f"""Classify the type of this medical document into one of the following:
 - medical_license
 - medical_degree
@@ -85,9 +114,6 @@ Similar documents for context:
 
 Respond with only the type name from the list."""
 
-    response = llm.invoke(prompt)
-    label = response.content.strip().lower()
-
     valid_labels = {
         "medical_license",
         "medical_degree",
@@ -96,12 +122,81 @@ Respond with only the type name from the list."""
         "not_a_valid_credential"
     }
 
+    response = await cached_ainvoke(
+        "classifier",
+        prompt,
+        cacheable=lambda content: content.strip().lower() in valid_labels,
+    )
+    label = response.content.strip().lower()
+
     if label not in valid_labels:
         raise ValueError(f"Unexpected classification output: {label}")
 
     return {"file_path": state["file_path"], "document_type": label}
 
 
+# Step 2 (single pass): classify and extract the fields in one call
+async def classify_and_extract(state: dict) -> ClassifierState:
+
+    content = state["file_content"]
+    context = state["context"]
+
+    prompt = f"""Classify the type of this medical document and extract its credential information.
+
+The document type is one of:
+- medical_license
+- medical_degree
+- training_certificate
+- board_certificate
+
+If its not a valid medical document or else it doesn't match with those 4 classification types then mark it as
+- not_a_valid_credential
+
+For a valid credential, also extract:
+- Name of the medical professional
+- License number
+- Issue date
+- Expiry date (if available)
+- Institution name
+- Certifying body (e.g., MCI, NMC, GMC)
+
+Leave a field empty when the document does not state it.
+
+Document:
+\"\"\"
+{content}
+\"\"\"
+
+Similar documents for context:
+\"\"\"
+{context}
+\"\"\"
+"""
+
+    result = await cached_astructured("classifier", prompt, ClassifiedCredential)
+    extracted = _credential_fields.validate_python(
+        result.model_dump(exclude={"document_type"})
+    )
+
+    return {
+        "file_path": state["file_path"],
+        "document_type": result.document_type,
+        "extracted": extracted,
+    }
+
+
+async def classify(state: dict) -> ClassifierState:
+    if not config.CLASSIFY_EXTRACT_SINGLE_PASS:
+        return await classify_document(state)
+
+    try:
+        return await classify_and_extract(state)
+    except ValueError as e:
+        # Includes pydantic's ValidationError
+        logging.warning(f"Single-pass classification failed, using two calls: {e}")
+        return await classify_document(state)
+
+
 # Step 3: Format result for output
 def format_output(state: ClassifierState) -> dict:
     return {"type": state["document_type"], "file_content": state['file_content']}
@@ -110,8 +205,10 @@ def format_output(state: ClassifierState) -> dict:
 # Build the LangGraph classifier agent
 def build_classifier_agent():
     graph = StateGraph(ClassifierState)
-    graph.add_node("EmbedAndRetrieve", embed_and_search)
-    graph.add_node("Classify", classify_document)
+    graph.add_node(
+        "EmbedAndRetrieve", instrument("classifier.EmbedAndRetrieve", embed_and_search)
+    )
+    graph.add_node("Classify", instrument("classifier.Classify", classify))
     graph.add_node("Format", format_output)
 
     graph.set_entry_point("EmbedAndRetrieve")
@@ -122,8 +219,30 @@ def build_classifier_agent():
     return graph.compile()
 
 
+register_graph("classifier", build_classifier_agent)
+
+
 # For testing or running directly
 async def classify_file(prev_state: dict) -> dict:
-    graph = build_classifier_agent()
-    result = await graph.ainvoke({"file_path": prev_state["file_paths"]["credential_path"]})
-    return {"classifier_result": result}
+    graph = get_graph("classifier")
+    upload = prev_state.get("uploads", {}).get("credential_path") or {}
+    result = await graph.ainvoke(
+        {
+            "file_path": prev_state["file_paths"]["credential_path"],
+            "file_data": upload.get("data"),
+            "file_hash": upload.get("sha256"),
+            **(prev_state.get("credential_context") or {}),
+        }
+    )
+    if result.get("extracted") is None:
+        return {"classifier_result": result}
+
+    # Single pass: the extractor has nothing left to do
+    return {
+        "classifier_result": result,
+        "credential_result": {
+            "file_path": result["file_path"],
+            "file_content": result["file_content"],
+            "extracted": result["extracted"],
+        },
+    }
@@ -1,15 +1,16 @@
 import json
 from typing import TypedDict, Optional
+from typing_extensions import TypedDict as ValidatedTypedDict
 from langgraph.graph import StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
-from astrapy import DataAPIClient
-from backend.utils.embeddings import get_text_embedding
-from backend.utils.file_reader import read_file_safely
+from backend.controller.graphs import register_graph, get_graph
+from backend.utils.llm_cache import cached_ainvoke
+from backend.utils.metrics import instrument
 from backend.config import main as config
 
 
-# Define extracted fields
-class CredentialFields(TypedDict, total=False):
+# Define extracted fields (pydantic validates it, which needs typing_extensions' TypedDict)
+class CredentialFields(ValidatedTypedDict, total=False):
+    name: Optional[str]
     license_number: Optional[str]
     issue_date: Optional[str]
     expiry_date: Optional[str]
@@ -24,13 +25,9 @@ class ExtractionState(TypedDict):
 
 
 # Step 1: Extract credentials with Gemini from previously read document
-def extract_credentials(state: ExtractionState) -> ExtractionState:
+async def extract_credentials(state: ExtractionState) -> ExtractionState:
     content = state["file_content"]
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest", google_api_key=config.GEMINI_API_KEY
-    )
-
     prompt = f"""
 Extract the following credential information from the medical document below:
 - Name of the medical professional
@@ -61,7 +58,7 @@ Document:
 \"\"\"
     """
 
-    response = llm.invoke(prompt)
+    response = await cached_ainvoke("extractor", prompt)
 
     try:
         extracted = (
@@ -87,7 +84,7 @@ def format_output(state: ExtractionState) -> dict:
 # Build the LangGraph
 def build_credential_extraction_agent():
     graph = StateGraph(ExtractionState)
-    graph.add_node("Extract", extract_credentials)
+    graph.add_node("Extract", instrument("extractor.Extract", extract_credentials))
     graph.add_node("Format", format_output)
 
     graph.set_entry_point("Extract")
@@ -97,9 +94,12 @@ def build_credential_extraction_agent():
     return graph.compile()
 
 
+register_graph("credential_extraction", build_credential_extraction_agent)
+
+
 # Async callable
 async def extract_credentials_from_file(prev_state: dict) -> dict:
-    graph = build_credential_extraction_agent()
+    graph = get_graph("credential_extraction")
     result = await graph.ainvoke(
         {
             "file_path": prev_state["file_paths"]["credential_path"],
@@ -1,17 +1,14 @@
 from langgraph.graph import StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
+from backend.controller.graphs import register_graph, get_graph
+from backend.utils.llm_cache import cached_ainvoke
+from backend.utils.metrics import instrument
 from backend.config import main as config
 import json
 
-def calculate_credibility_score(state: dict) -> dict:
+async def calculate_credibility_score(state: dict) -> dict:
     crosscheck = state["crosscheck"]
     verification = state["verification"]
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest",
-        google_api_key=config.GEMINI_API_KEY
-    )
-
     prompt = f"""
 You are a medical credential assessment agent.
 
@@ -47,7 +44,7 @@ Strictly follow the JSON string format.
 """
 
     try:
-        response = llm.invoke(prompt)
+        response = await cached_ainvoke("evaluator", prompt)
         result = json.loads(response.content.strip())
         return result
     except Exception as e:
@@ -59,14 +56,20 @@ Strictly follow the JSON string format.
 
 def build_credibility_score_agent():
     graph = StateGraph(dict)
-    graph.add_node("EvaluateCredibility", calculate_credibility_score)
+    graph.add_node(
+        "EvaluateCredibility",
+        instrument("evaluator.EvaluateCredibility", calculate_credibility_score),
+    )
     graph.set_entry_point("EvaluateCredibility")
     graph.set_finish_point("EvaluateCredibility")
     return graph.compile()
 
 
+register_graph("credibility_score", build_credibility_score_agent)
+
+
 async def evaluate_credibility(prev_state: dict) -> dict:
-    graph = build_credibility_score_agent()
+    graph = get_graph("credibility_score")
     result = await graph.ainvoke({
         "crosscheck": prev_state['crosscheck_result'],
         "verification": prev_state['verifier_result']['status']
@@ -1,20 +1,17 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+from backend.controller.graphs import register_graph, get_graph
+from backend.utils.llm_cache import cached_ainvoke
+from backend.utils.metrics import instrument, crosscheck_decisions
+from backend.utils.field_matcher import match_fields
 from backend.config import main as config
-from backend.utils.file_reader import read_file_safely
+from backend.utils.file_reader import aread_upload
 import json
 from langgraph.graph import StateGraph
 
 
-def cross_check_with_gemini(state: dict) -> dict:
+async def cross_check_with_gemini(state: dict) -> dict:
     extracted = state["extracted"]
     verification = state["verification"]
-    resume_path = state["resume_path"]
-
-    resume_text = read_file_safely(resume_path)
-
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest", google_api_key=config.GEMINI_API_KEY
-    )
+    resume_text = state["resume_text"]
 
     prompt = f"""
 You are an expert medical document auditor.
@@ -66,7 +63,7 @@ Strictly follow the JSON string format.
 """
 
     try:
-        response = llm.invoke(prompt)
+        response = await cached_ainvoke("crosscheck", prompt)
         print(response.content)
         result = json.loads(response.content.strip())
         return {"result": result}
@@ -74,22 +71,92 @@ Strictly follow the JSON string format.
         return {"consistency_report": {}, "discrepancies": [f"LLM error: {str(e)}"]}
 
 
+async def cross_check_fields(state: dict) -> dict:
+    """
+    Matches the credential fields against the resume locally; Gemini is only
+    asked, for the whole report and its discrepancies, when a field scores
+    between the match and mismatch thresholds.
+    """
+    extracted = state["extracted"]
+    if not config.CROSSCHECK_LOCAL_MATCH or not isinstance(extracted, dict):
+        return await cross_check_with_gemini(state)
+
+    local = match_fields(
+        extracted,
+        state["resume_text"],
+        config.CROSSCHECK_MATCH_SCORE,
+        config.CROSSCHECK_MISMATCH_SCORE,
+    )
+    if not local["ambiguous"]:
+        crosscheck_decisions.inc(decided_by="matcher")
+        return {
+            "result": {
+                "consistency_report": local["consistency_report"],
+                "discrepancies": local["discrepancies"],
+            }
+        }
+
+    crosscheck_decisions.inc(decided_by="llm")
+    llm_result = await cross_check_with_gemini(state)
+    if "result" not in llm_result:
+        # LLM failed, the fields it had to settle stay unconfirmed
+        report = {key: bool(match) for key, match in local["consistency_report"].items()}
+        return {
+            "result": {
+                "consistency_report": report,
+                "discrepancies": local["discrepancies"] + llm_result["discrepancies"],
+            }
+        }
+
+    llm_report = llm_result["result"].get("consistency_report") or {}
+    report = dict(local["consistency_report"])
+    for key in local["ambiguous"]:
+        report[key] = bool(llm_report.get(key, False))
+
+    return {
+        "result": {
+            "consistency_report": report,
+            "discrepancies": llm_result["result"].get("discrepancies") or [],
+        }
+    }
+
+
 def build_cross_check_agent():
     graph = StateGraph(dict)
-    graph.add_node("CrossCheck", cross_check_with_gemini)
+    graph.add_node(
+        "CrossCheck", instrument("crosscheck.CrossCheck", cross_check_fields)
+    )
     graph.set_entry_point("CrossCheck")
     graph.set_finish_point("CrossCheck")
     return graph.compile()
 
 
+register_graph("cross_check", build_cross_check_agent)
+
+
 async def cross_check_all(prev_state: dict) -> dict:
-    graph = build_cross_check_agent()
+    graph = get_graph("cross_check")
     result = await graph.ainvoke(
         {
             "extracted": prev_state['credential_result']['extracted'],
             "verification": prev_state['verifier_result']['status'],
-            "resume_path": prev_state["file_paths"]["resume_path"],
+            "resume_text": prev_state["resume_text"],
         }
     )
     
     return {"crosscheck_result": result}
+
+
+async def read_resume(prev_state: dict) -> dict:
+    # Independent of the credential, so the orchestrator runs it from the start
+    if prev_state.get("resume_text") is not None:
+        # Already read once for the whole batch
+        return {"resume_text": prev_state["resume_text"]}
+
+    upload = prev_state.get("uploads", {}).get("resume_path") or {}
+    resume_text = await aread_upload(
+        prev_state["file_paths"]["resume_path"],
+        upload.get("data"),
+        upload.get("sha256"),
+    )
+    return {"resume_text": resume_text}
@@ -1,37 +1,75 @@
-from langgraph.graph import StateGraph
-from astrapy import DataAPIClient
+from langgraph.graph import StateGraph, END
 from backend.config import main as config
-from backend.utils.embeddings import get_text_embedding
-from langchain_google_genai import ChatGoogleGenerativeAI
+from backend.utils.embeddings import aget_text_embedding
+from backend.utils.vector_store import get_vector_store
+from backend.utils.registry_index import get_registry_index
+from backend.utils.llm_cache import cached_ainvoke
+from backend.utils.metrics import instrument, track_retrieval, registry_lookups
+from backend.controller.graphs import register_graph, get_graph
 import json
 
 
-def embed_and_retrieve_credential(state: dict) -> dict:
-    credential_text = json.dumps(state["extracted"])
+def match_registry(state: dict) -> dict:
+    """
+    Settles verification without retrieval or the LLM when the extracted
+    identifier resolves to exactly one registry record that agrees on name
+    and issue date.
+    """
+    extracted = state["extracted"]
+    if not config.REGISTRY_EXACT_MATCH or not isinstance(extracted, dict):
+        return state
+
+    record, candidates = get_registry_index().match(extracted)
+    if record is not None:
+        registry_lookups.inc(outcome="hit")
+        return {
+            **state,
+            "licence_record": extracted,
+            "status": "valid",
+            "retrieved_context": record["text"],
+            "result": json.dumps(
+                {"status": "valid", "matched_by": "registry_index", "record_id": record["id"]}
+            ),
+        }
+
+    if candidates:
+        registry_lookups.inc(outcome="conflict")
+        # The identifier is known but the details differ, let the LLM judge
+        # against those records rather than the nearest vector hit
+        return {
+            **state,
+            "retrieved_context": "\n---\n".join(r["text"] for r in candidates),
+        }
+
+    registry_lookups.inc(outcome="miss")
+    return state
+
+
+def route_registry_match(state: dict) -> str:
+    return END if "status" in state else "EmbedAndRetrieve"
+
+
+async def embed_and_retrieve_credential(state: dict) -> dict:
+    # Registry candidates or the classifier's hit were handed over, skip the lookup
+    if state.get("retrieved_context"):
+        return state
 
-    embedding = get_text_embedding(credential_text)
+    credential_text = json.dumps(state["extracted"])
 
-    client = DataAPIClient(config.ASTRA_DB_SECRET_KEY)
-    db = client.get_database_by_api_endpoint(
-        config.ASTRA_DB_ENDPOINT, keyspace=config.ASTRA_DB_KEYSPACE
-    )
-    collection = db.get_collection("embeddings")
+    embedding = await aget_text_embedding(credential_text)
 
-    results = collection.find({},sort={"$vector": embedding}, limit=1)
+    with track_retrieval("verifier"):
+        results = await get_vector_store().asearch(embedding, limit=1)
 
     retrieved_context = "\n---\n".join(r["text"] for r in results if "text" in r)
 
     return {**state, "retrieved_context": retrieved_context}
 
 
-def validate_credential_with_llm(state: dict) -> dict:
+async def validate_credential_with_llm(state: dict) -> dict:
     credential_text = state["extracted"]
     context = state["retrieved_context"]
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest", google_api_key=config.GEMINI_API_KEY
-    )
-
     prompt = f"""
 You are verifying the validity of a medical credential based on vector search results.
 
@@ -69,7 +107,7 @@ Strictly follow the JSON string format.
 """
 
     try:
-        response = llm.invoke(prompt)
+        response = await cached_ainvoke("verifier", prompt)
         result = json.loads(response.content.strip())
         status = result["status"]
     except Exception as e:
@@ -82,18 +120,44 @@ Strictly follow the JSON string format.
 def build_credential_verification_agent():
     graph = StateGraph(dict)
 
-    graph.add_node("EmbedAndRetrieve", embed_and_retrieve_credential)
-    graph.add_node("ValidateWithLLM", validate_credential_with_llm)
+    graph.add_node(
+        "MatchRegistry", instrument("verifier.MatchRegistry", match_registry)
+    )
+    graph.add_node(
+        "EmbedAndRetrieve",
+        instrument("verifier.EmbedAndRetrieve", embed_and_retrieve_credential),
+    )
+    graph.add_node(
+        "ValidateWithLLM",
+        instrument("verifier.ValidateWithLLM", validate_credential_with_llm),
+    )
 
-    graph.set_entry_point("EmbedAndRetrieve")
+    graph.set_entry_point("MatchRegistry")
+    graph.add_conditional_edges(
+        "MatchRegistry", route_registry_match, ["EmbedAndRetrieve", END]
+    )
     graph.add_edge("EmbedAndRetrieve", "ValidateWithLLM")
     graph.set_finish_point("ValidateWithLLM")
 
     return graph.compile()
 
 
+register_graph("credential_verification", build_credential_verification_agent)
+
+
 async def verify_extracted_credential(prev_state: dict) -> dict:
-    
-    graph = build_credential_verification_agent()
-    result = await graph.ainvoke({"extracted": prev_state['credential_result']['extracted']})
+    graph = get_graph("credential_verification")
+    state = {"extracted": prev_state["credential_result"]["extracted"]}
+
+    # Opt-in: reuse the best hit of the classifier's search, made with the raw
+    # document text, instead of searching again with the extracted fields.
+    # Saves an embed + search after extraction, but may compare against a
+    # different registry record.
+    if config.VERIFIER_REUSE_CLASSIFIER_MATCH:
+        matches = prev_state["classifier_result"].get("matches") or []
+        state["retrieved_context"] = "\n---\n".join(
+            r["text"] for r in matches[:1] if "text" in r
+        )
+
+    result = await graph.ainvoke(state)
     return {"verifier_result": result}
@@ -0,0 +1,260 @@
+# controller/batch.py
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from backend.config import main as config
+from backend.constants.enums import ReportStatus
+from backend.controller import jobs
+from backend.controller.agent import process_report, update_report
+from backend.controller.agents.classifier_agent import similar_context
+from backend.models.BatchReport import BatchReport
+from backend.models.ReportHistory import ReportHistory
+from backend.utils.embeddings import aget_query_embeddings
+from backend.utils.file_reader import aread_upload
+from backend.utils.generate_random_string import generate_random_string
+from backend.utils.metrics import start_run, track_retrieval
+from backend.utils.vector_store import get_vector_store
+
+UNFINISHED = [ReportStatus.PENDING.value, ReportStatus.PROCESSING.value]
+FLAG_SEVERITY = {"green": 0, "yellow": 1, "red": 2}
+
+
+async def run_batch_agent(
+    resume_path: str,
+    credential_paths: list[str],
+    curr_user,
+    uploads: Optional[dict] = None,
+) -> BatchReport:
+    """
+    Creates the batch and one pending report per credential, then queues the
+    whole batch as a single job. `uploads` holds upload bytes / hashes keyed
+    by file path.
+    """
+    if not jobs.has_capacity():
+        raise jobs.QueueFullError("Report queue is full")
+
+    batch = BatchReport(
+        user_id=curr_user.user_id,
+        batch_id=generate_random_string(7),
+        validator_type="resume",
+        validator_path=resume_path,
+    )
+    reports = [
+        ReportHistory(
+            user_id=curr_user.user_id,
+            report_id=generate_random_string(7),
+            credential_type="",
+            credential_path=credential_path,
+            validator_type="resume",
+            validator_path=resume_path,
+            result={},
+            batch_id=batch.batch_id,
+            status=ReportStatus.PENDING,
+        )
+        for credential_path in credential_paths
+    ]
+
+    await asyncio.gather(*(report.insert() for report in reports))
+    batch.report_ids = [report.report_id for report in reports]
+    await batch.insert()
+
+    try:
+        jobs.enqueue({"batch": batch, "reports": reports, "uploads": uploads or {}})
+    except jobs.QueueFullError:
+        await fail_batch(batch, reports, "Report queue is full")
+        raise
+
+    return batch
+
+
+async def fail_batch(batch: BatchReport, reports: list[ReportHistory], error: str) -> None:
+    await asyncio.gather(
+        *(
+            update_report(report, status=ReportStatus.FAILED, result={"error": error})
+            for report in reports
+            if report.status.value in UNFINISHED
+        )
+    )
+    await update_report(batch, status=ReportStatus.FAILED, result={"error": error})
+
+
+async def read_upload(path: str, uploads: dict) -> str:
+    upload = uploads.get(path) or {}
+    return await aread_upload(path, upload.get("data"), upload.get("sha256"))
+
+
+async def prefetch_contexts(paths: list[str], uploads: dict) -> list[Optional[dict]]:
+    """
+    Reads every credential, embeds them in one call and searches the registry
+    with one batch query. A credential that cannot be read gets None and is
+    left to its own pipeline run, which reports the error.
+    """
+    texts = await asyncio.gather(
+        *(read_upload(path, uploads) for path in paths), return_exceptions=True
+    )
+    readable = [i for i, text in enumerate(texts) if isinstance(text, str)]
+    if not readable:
+        return [None] * len(paths)
+
+    embeddings = await aget_query_embeddings([texts[i] for i in readable])
+    with track_retrieval("classifier"):
+        results = await get_vector_store().asearch_batch(embeddings, limit=5)
+
+    contexts = [None] * len(paths)
+    for i, matches in zip(readable, results):
+        contexts[i] = {
+            "file_content": texts[i],
+            "context": similar_context(matches),
+            "matches": matches,
+        }
+    return contexts
+
+
+def aggregate_credibility(reports: list[ReportHistory]) -> dict:
+    """
+    One credibility verdict for the practitioner: the mean score of the
+    verified documents, the worst flag, and every discrepancy prefixed with
+    the report it came from. A document that could not be processed counts as
+    at least a yellow flag.
+    """
+    documents, discrepancies, scores = [], [], []
+    flags = {"green": 0, "yellow": 0, "red": 0}
+    failed = 0
+    worst = "green"
+
+    for report in reports:
+        credibility = report.result.get("credebility_result") or {}
+        flag = credibility.get("flag")
+        documents.append(
+            {
+                "report_id": report.report_id,
+                "credential_type": report.credential_type,
+                "status": report.status.value,
+                "credibility_score": credibility.get("credibility_score"),
+                "flag": flag,
+            }
+        )
+
+        if report.status != ReportStatus.COMPLETED:
+            failed += 1
+            flag = "yellow"
+            discrepancies.append(f"{report.report_id}: could not be verified")
+        else:
+            label = report.credential_type or report.report_id
+            discrepancies.extend(
+                f"{label}: {d}" for d in credibility.get("discrepancies") or []
+            )
+            if isinstance(credibility.get("credibility_score"), (int, float)):
+                scores.append(credibility["credibility_score"])
+
+        if flag in FLAG_SEVERITY:
+            if report.status == ReportStatus.COMPLETED:
+                flags[flag] += 1
+            if FLAG_SEVERITY[flag] > FLAG_SEVERITY[worst]:
+                worst = flag
+
+    summary = (
+        f"{len(reports) - failed} of {len(reports)} credentials verified: "
+        f"{flags['green']} green, {flags['yellow']} yellow, {flags['red']} red"
+    )
+    if failed:
+        summary += f", {failed} could not be processed"
+
+    return {
+        "credibility_score": round(sum(scores) / len(scores)) if scores else 0,
+        "flag": worst,
+        "summary": summary,
+        "discrepancies": discrepancies,
+        "documents": documents,
+    }
+
+
+async def process_batch(job: dict) -> None:
+    """
+    Worker side of `run_batch_agent`: the resume is read once, the credentials
+    are embedded and searched together, then each one goes through the
+    pipeline with at most BATCH_CONCURRENCY in flight.
+    """
+    batch, reports = job["batch"], job["reports"]
+    uploads = job.get("uploads") or {}
+    await update_report(batch, status=ReportStatus.PROCESSING)
+
+    stats = start_run()
+    started_at = time.perf_counter()
+    # Reports finished before a restart are kept, only the rest run again
+    pending = [report for report in reports if report.status.value in UNFINISHED]
+
+    try:
+        resume_text, contexts = await asyncio.gather(
+            read_upload(batch.validator_path, uploads),
+            prefetch_contexts([report.credential_path for report in pending], uploads),
+        )
+    except Exception as e:
+        logging.exception(f"Batch {batch.batch_id} failed")
+        await fail_batch(batch, reports, str(e))
+        return
+    prefetch_seconds = time.perf_counter() - started_at
+
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+
+    async def run_one(report: ReportHistory, context: Optional[dict]) -> None:
+        async with semaphore:
+            await process_report(
+                {
+                    "report": report,
+                    "uploads": {"credential_path": uploads.get(report.credential_path)},
+                    "resume_text": resume_text,
+                    "credential_context": context,
+                }
+            )
+
+    await asyncio.gather(*(run_one(r, c) for r, c in zip(pending, contexts)))
+
+    result = aggregate_credibility(reports)
+    completed = any(report.status == ReportStatus.COMPLETED for report in reports)
+    total = time.perf_counter() - started_at
+    logging.info(
+        f"Batch {batch.batch_id}: {len(pending)} credentials in {total:.3f}s"
+    )
+
+    await update_report(
+        batch,
+        result=result,
+        timings={
+            "total": round(total, 4),
+            "prefetch": round(prefetch_seconds, 4),
+            **stats,
+        },
+        status=ReportStatus.COMPLETED if completed else ReportStatus.FAILED,
+    )
+
+
+async def process_job(job: dict) -> None:
+    """
+    Worker entry point: batches and single reports share the job queue.
+    """
+    if "batch" in job:
+        await process_batch(job)
+    else:
+        await process_report(job)
+
+
+async def requeue_unfinished_batches() -> None:
+    """
+    Same as `requeue_unfinished_reports`, for whole batches.
+    """
+    unfinished = await BatchReport.find({"status": {"$in": UNFINISHED}}).to_list()
+
+    for batch in unfinished:
+        reports = await ReportHistory.find(
+            {"batch_id": batch.batch_id, "user_id": batch.user_id}
+        ).to_list()
+
+        if not jobs.has_capacity():
+            await fail_batch(batch, reports, "Report queue is full")
+            continue
+
+        await update_report(batch, status=ReportStatus.PENDING)
+        jobs.enqueue({"batch": batch, "reports": reports})
@@ -0,0 +1,29 @@
+# controller/graphs.py
+import logging
+from typing import Callable
+
+# Builders register themselves here when their agent module is imported
+_builders: dict[str, Callable] = {}
+_graphs: dict = {}
+
+
+def register_graph(name: str, builder: Callable) -> None:
+    _builders[name] = builder
+
+
+def init_graphs() -> dict:
+    """
+    Builds and compiles every registered graph once. Compiled LangGraph graphs
+    are stateless between invocations, so they are shared by all requests.
+    """
+    for name, builder in _builders.items():
+        if name not in _graphs:
+            _graphs[name] = builder()
+    logging.info(f"Compiled graphs: {', '.join(_graphs)}")
+    return _graphs
+
+
+def get_graph(name: str):
+    if name not in _graphs:
+        _graphs[name] = _builders[name]()
+    return _graphs[name]
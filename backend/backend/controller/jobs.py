@@ -0,0 +1,66 @@
+# controller/jobs.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from backend.config import main as config
+
+# Bounded in-process queue drained by a fixed set of worker tasks
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+
+
+class QueueFullError(Exception):
+    pass
+
+
+async def _worker(name: str, handler: Callable[..., Awaitable]) -> None:
+    while True:
+        job = await _queue.get()
+        try:
+            await handler(job)
+        except Exception:
+            logging.exception(f"{name} failed to process job")
+        finally:
+            _queue.task_done()
+
+
+def start_workers(handler: Callable[..., Awaitable]) -> None:
+    global _queue
+
+    _queue = asyncio.Queue(maxsize=config.JOB_QUEUE_SIZE)
+    for i in range(config.JOB_WORKERS):
+        name = f"report-worker-{i}"
+        _workers.append(asyncio.create_task(_worker(name, handler), name=name))
+
+    logging.info(
+        f"Started {config.JOB_WORKERS} report workers (queue size {config.JOB_QUEUE_SIZE})"
+    )
+
+
+async def stop_workers() -> None:
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def has_capacity() -> bool:
+    return _queue is not None and not _queue.full()
+
+
+def free_slots() -> int:
+    return _queue.maxsize - _queue.qsize() if _queue is not None else 0
+
+
+def enqueue(job) -> None:
+    if _queue is None:
+        raise QueueFullError("Report workers are not running")
+    try:
+        _queue.put_nowait(job)
+    except asyncio.QueueFull:
+        raise QueueFullError("Report queue is full")
+
+
+def queue_depth() -> int:
+    return _queue.qsize() if _queue is not None else 0
@@ -1,25 +1,45 @@
 import os
-import shutil
+import json
+import asyncio
+import hashlib
+import zipfile
+from typing import Optional
 
-
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import HTTPException
 from datetime import datetime, timezone, timedelta
 from beanie import PydanticObjectId
+from bson import ObjectId
 from uuid import uuid4 as uuid
 from uuid import UUID
-import bcrypt
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from fastapi.encoders import jsonable_encoder
 
 from backend.models.User import User
 from backend.models.Token import Token
 from backend.models.ReportHistory import ReportHistory
-
-from backend.security.jsonwebtoken import generate_jwt_token
+from backend.models.BatchReport import BatchReport
+
+from backend.security.jsonwebtoken import generate_jwt_token, revoke_session
+from backend.security.password import (
+    PasswordPoolBusyError,
+    hash_password,
+    check_password,
+)
 from backend.config import main as config
+from backend.constants.enums import ReportStatus
 
 from backend.controller.agent import run_agent as agent_run
+from backend.controller.batch import run_batch_agent
+from backend.controller.jobs import QueueFullError, free_slots
+
+
+def server_busy_response() -> JSONResponse:
+    return JSONResponse(
+        {"success": False, "message": "Server is busy, please try again shortly"},
+        status_code=503,
+        headers={"Retry-After": "30"},
+    )
 
 
 async def signup(signup_data):
@@ -35,14 +55,15 @@ async def signup(signup_data):
             {"success": False, "message": "User already exists"}, status_code=400
         )
 
-    hashed_password = bcrypt.hashpw(
-        signup_data.password.encode("utf-8"), bcrypt.gensalt()
-    )
+    try:
+        hashed_password = await hash_password(signup_data.password)
+    except PasswordPoolBusyError:
+        return server_busy_response()
 
     new_user = User(
         name=signup_data.name,
         email=signup_data.email,
-        password=hashed_password.decode("utf-8"),
+        password=hashed_password,
     )
 
     await new_user.save()
@@ -70,9 +91,12 @@ async def signin(signin_data):
             {"success": False, "message": "User not found"}, status_code=404
         )
 
-    if not bcrypt.checkpw(
-        signin_data.password.encode("utf-8"), user.password.encode("utf-8")
-    ):
+    try:
+        is_password_valid = await check_password(signin_data.password, user.password)
+    except PasswordPoolBusyError:
+        return server_busy_response()
+
+    if not is_password_valid:
         return JSONResponse(
             {"success": False, "message": "Invalid password"}, status_code=400
         )
@@ -114,68 +138,441 @@ async def signin(signin_data):
     )
 
 
-async def file_handler(credential, resume):
-    credential_path = os.path.join(config.STORE_DIR, str(uuid()) + credential.filename)
-    resume_path = os.path.join(config.STORE_DIR, str(uuid()) + resume.filename)
+async def signout(curr_user):
+    await revoke_session(str(curr_user.session_id))
 
-    with open(credential_path, "wb") as f:
-        shutil.copyfileobj(credential.file, f)
+    return JSONResponse(
+        {
+            "success": True,
+            "message": "User signed out successfully",
+            "navigate": "/signin",
+        },
+        status_code=200,
+    )
 
-    resume.file.seek(0)
-    with open(resume_path, "wb") as f:
-        shutil.copyfileobj(resume.file, f)
 
-    return {"credential_path": credential_path, "resume_path": resume_path}
+class UploadTooLargeError(Exception):
+    pass
+
+
+async def save_upload(upload) -> dict:
+    """
+    Streams an upload to the store in chunks, hashing it on the way and
+    keeping the bytes so the extractors do not have to read the file again.
+    """
+    if upload.size is not None and upload.size > config.MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(upload.filename)
+
+    loop = asyncio.get_running_loop()
+    path = os.path.join(config.STORE_DIR, str(uuid()) + upload.filename)
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+
+    f = await loop.run_in_executor(None, open, path, "wb")
+    try:
+        while chunk := await upload.read(config.UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > config.MAX_UPLOAD_BYTES:
+                raise UploadTooLargeError(upload.filename)
+
+            digest.update(chunk)
+            if size <= config.UPLOAD_INLINE_BYTES:
+                chunks.append(chunk)
+            await loop.run_in_executor(None, f.write, chunk)
+    except BaseException:
+        # Too large, a client disconnect or a failed write: no partial files left behind
+        await loop.run_in_executor(None, f.close)
+        await loop.run_in_executor(None, os.remove, path)
+        raise
+    finally:
+        if not f.closed:
+            await loop.run_in_executor(None, f.close)
+
+    data = b"".join(chunks) if size <= config.UPLOAD_INLINE_BYTES else None
+    return {"path": path, "sha256": digest.hexdigest(), "data": data}
 
 
-async def run_agent(credential, resume, curr_user):
+async def file_handler(credential, resume):
+    results = await asyncio.gather(
+        save_upload(credential), save_upload(resume), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        for result in results:
+            if not isinstance(result, BaseException):
+                os.remove(result["path"])
+        raise errors[0]
+
+    credential_upload, resume_upload = results
+
+    return {
+        "credential_path": credential_upload["path"],
+        "resume_path": resume_upload["path"],
+    }, {
+        "credential_path": credential_upload,
+        "resume_path": resume_upload,
+    }
 
-    files_locations = await file_handler(credential, resume)
 
-    result = await agent_run(files_locations, curr_user)
+async def run_agent(credential, resume, curr_user, force: bool = False):
+
+    try:
+        files_locations, uploads = await file_handler(credential, resume)
+    except UploadTooLargeError as e:
+        return JSONResponse(
+            {
+                "success": False,
+                "message": f"{e} exceeds the {config.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+            },
+            status_code=413,
+        )
 
-    print("Agent Result:", result)
+    try:
+        report = await agent_run(files_locations, curr_user, uploads, force)
+    except QueueFullError:
+        return server_busy_response()
 
+    # An earlier report of the same files was reused, these copies are unused
+    if report.credential_path != files_locations["credential_path"]:
+        remove_uploads(list(uploads.values()))
+
+    reused = report.status == ReportStatus.COMPLETED
     return JSONResponse(
         {
             "success": True,
-            "message": "Agent ran successfully",
+            "message": "Report reused" if reused else "Report queued",
             "navigate": "/",
-            "result": jsonable_encoder(result),
+            "result": {
+                "report_id": report.report_id,
+                "status": report.status.value,
+                "reused_from": report.reused_from,
+            },
         },
-        status_code=200,
+        status_code=200 if reused else 202,
     )
 
 
-async def report_history_list(curr_user):
+class InvalidBatchError(Exception):
+    pass
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def remove_uploads(uploads: list[dict]) -> None:
+    for upload in uploads:
+        try:
+            os.remove(upload["path"])
+        except FileNotFoundError:
+            pass
 
-    class ProjectionModel(BaseModel):
-        user_id: PydanticObjectId
-        report_id: str
-        created_at: datetime
-        status: str
-        id: PydanticObjectId = Field(alias="_id")
-        
-        class Config:
-            allow_population_by_field_name = True
 
+async def save_uploads(files: list) -> list[dict]:
+    """
+    `save_upload` for several files at once; nothing is left in the store
+    when one of them fails.
+    """
+    results = await asyncio.gather(
+        *(save_upload(file) for file in files), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        remove_uploads([r for r in results if not isinstance(r, BaseException)])
+        raise errors[0]
+    return results
+
+
+def extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, budget: int) -> dict:
+    """
+    Like `save_upload`, for one file of a ZIP. Sizes are counted while
+    decompressing, the sizes the archive declares are not trusted.
+    """
+    path = os.path.join(config.STORE_DIR, str(uuid()) + os.path.basename(info.filename))
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+
+    try:
+        with archive.open(info) as src, open(path, "wb") as dst:
+            while chunk := src.read(config.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > config.MAX_UPLOAD_BYTES:
+                    raise UploadTooLargeError(info.filename)
+                if size > budget:
+                    raise InvalidBatchError(
+                        f"Archive expands to more than {config.BATCH_ARCHIVE_MAX_BYTES // (1024 * 1024)} MB"
+                    )
+
+                digest.update(chunk)
+                if size <= config.UPLOAD_INLINE_BYTES:
+                    chunks.append(chunk)
+                dst.write(chunk)
+    except BaseException:
+        remove_uploads([{"path": path}])
+        raise
+
+    data = b"".join(chunks) if size <= config.UPLOAD_INLINE_BYTES else None
+    return {"path": path, "sha256": digest.hexdigest(), "data": data, "size": size}
+
+
+def extract_archive(path: str) -> tuple[dict[str, dict], Optional[list]]:
+    """
+    Writes the files of a ZIP upload to the store and returns them by member
+    name, together with its parsed manifest.json if there is one. Blocking,
+    run it in the executor.
+    """
+    members, manifest = {}, None
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = [
+                info
+                for info in archive.infolist()
+                if not info.is_dir()
+                and not info.filename.startswith("__MACOSX/")
+                and not os.path.basename(info.filename).startswith(".")
+            ]
+            if len(infos) > config.BATCH_ARCHIVE_MAX_FILES:
+                raise InvalidBatchError(
+                    f"Archive has more than {config.BATCH_ARCHIVE_MAX_FILES} files"
+                )
+
+            budget = config.BATCH_ARCHIVE_MAX_BYTES
+            for info in infos:
+                member = extract_member(archive, info, budget)
+                budget -= member.pop("size")
+                members[info.filename] = member
+
+        if MANIFEST_NAME in members:
+            manifest_file = members.pop(MANIFEST_NAME)
+            with open(manifest_file["path"], "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            remove_uploads([manifest_file])
+    except zipfile.BadZipFile:
+        remove_uploads(list(members.values()))
+        raise InvalidBatchError("Archive is not a valid ZIP file")
+    except ValueError:
+        remove_uploads(list(members.values()))
+        raise InvalidBatchError(f"{MANIFEST_NAME} is not valid JSON")
+    except BaseException:
+        remove_uploads(list(members.values()))
+        raise
+
+    return members, manifest
+
+
+def manifest_groups(manifest, members: dict[str, dict]) -> list[tuple[dict, list[dict]]]:
+    """
+    Resolves a manifest, `[{"resume": name, "credentials": [name, ...]}, ...]`
+    with names relative to the archive root, to (resume, credentials) uploads.
+    """
+    if not isinstance(manifest, list) or not manifest:
+        raise InvalidBatchError(f"{MANIFEST_NAME} must be a non-empty list of practitioners")
+
+    groups = []
+    for i, entry in enumerate(manifest):
+        if not isinstance(entry, dict) or not isinstance(entry.get("credentials"), list):
+            raise InvalidBatchError(f"{MANIFEST_NAME} entry {i} needs a resume and credentials")
+
+        names = [entry.get("resume"), *entry["credentials"]]
+        if not all(isinstance(name, str) for name in names):
+            raise InvalidBatchError(f"{MANIFEST_NAME} entry {i} names must be strings")
+        missing = [str(name) for name in names if name not in members]
+        if missing:
+            raise InvalidBatchError(f"Not in the archive: {', '.join(missing)}")
+
+        groups.append((members[names[0]], [members[name] for name in names[1:]]))
+    return groups
+
+
+async def batch_file_handler(credentials, resume, archive) -> list[tuple[dict, list[dict]]]:
+    """
+    Saves a batch upload and groups it by practitioner: the credentials of a
+    ZIP (plus any uploaded alongside it) checked against the uploaded resume,
+    or one group per manifest.json entry.
+    """
+    saved = await save_uploads([*credentials, *([resume] if resume else [])])
+    credential_uploads = saved[: len(credentials)]
+    resume_upload = saved[len(credentials)] if resume else None
+
+    members, manifest = {}, None
+    try:
+        if archive:
+            archive_upload = await save_upload(archive)
+            loop = asyncio.get_running_loop()
+            try:
+                members, manifest = await loop.run_in_executor(
+                    None, extract_archive, archive_upload["path"]
+                )
+            finally:
+                remove_uploads([archive_upload])
+
+        if manifest is not None:
+            if saved:
+                raise InvalidBatchError(
+                    f"Upload either an archive with {MANIFEST_NAME} or a resume and credentials"
+                )
+            groups = manifest_groups(manifest, members)
+        else:
+            if resume_upload is None:
+                raise InvalidBatchError("A resume is required")
+            # Archive members in name order, then the loose files
+            credential_uploads = [members[name] for name in sorted(members)] + credential_uploads
+            groups = [(resume_upload, credential_uploads)]
+
+        for _, group_credentials in groups:
+            if not 1 <= len(group_credentials) <= config.BATCH_MAX_DOCUMENTS:
+                raise InvalidBatchError(
+                    f"A batch takes 1 to {config.BATCH_MAX_DOCUMENTS} credentials per resume"
+                )
+    except BaseException:
+        remove_uploads(saved + list(members.values()))
+        raise
+
+    # Archive files no manifest entry points at are not kept
+    used = {upload["path"] for r, c in groups for upload in [r, *c]}
+    remove_uploads([u for u in members.values() if u["path"] not in used])
+    return groups
+
+
+async def run_batch(credentials, resume, archive, curr_user):
+    try:
+        groups = await batch_file_handler(credentials, resume, archive)
+    except UploadTooLargeError as e:
+        return JSONResponse(
+            {
+                "success": False,
+                "message": f"{e} exceeds the {config.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+            },
+            status_code=413,
+        )
+    except InvalidBatchError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+
+    # Each practitioner is one job, take all of them or none
+    if free_slots() < len(groups):
+        remove_uploads([upload for r, c in groups for upload in [r, *c]])
+        return server_busy_response()
+
+    batches = []
+    for position, (resume_upload, credential_uploads) in enumerate(groups):
+        uploads = {u["path"]: u for u in [resume_upload, *credential_uploads]}
+        try:
+            batches.append(
+                await run_batch_agent(
+                    resume_upload["path"],
+                    [u["path"] for u in credential_uploads],
+                    curr_user,
+                    uploads,
+                )
+            )
+        except QueueFullError:
+            # Other requests took the slots meanwhile; the batches already
+            # queued keep running, the files of the rest are dropped
+            remove_uploads([upload for r, c in groups[position:] for upload in [r, *c]])
+            break
+
+    if not batches:
+        return server_busy_response()
+
+    rejected = list(range(len(batches), len(groups)))
+    return JSONResponse(
+        {
+            "success": True,
+            "message": (
+                f"{len(batches)} of {len(groups)} batches queued, the server is busy"
+                if rejected
+                else "Batch queued"
+            ),
+            "navigate": "/",
+            "result": [
+                {
+                    "batch_id": batch.batch_id,
+                    "report_ids": batch.report_ids,
+                    "status": batch.status.value,
+                }
+                for batch in batches
+            ],
+            # Positions (manifest order) of the groups that were not queued
+            "rejected": rejected,
+        },
+        status_code=202,
+    )
+
+
+async def batch_report(batch_id: str, curr_user):
+    batch = await BatchReport.find_one({"batch_id": batch_id, "user_id": curr_user.user_id})
+
+    if not batch:
+        return JSONResponse(
+            {"success": False, "message": "Batch not found"}, status_code=400
+        )
 
     reports = await ReportHistory.find(
-        {"user_id": curr_user.user_id}, projection_model=ProjectionModel, sort=[('_id', -1)]
+        {"batch_id": batch_id, "user_id": curr_user.user_id},
+        projection_model=ReportHistoryItem,
     ).to_list()
 
-    reports = jsonable_encoder(reports)
-
     return JSONResponse(
         {
             "success": True,
-            "message": "Report history list",
             "navigate": "/",
-            "result": reports,
+            "result": {
+                **jsonable_encoder(batch),
+                "reports": jsonable_encoder(reports),
+            },
         },
         status_code=200,
     )
 
+
+class ReportHistoryItem(BaseModel):
+    """
+    Fields the history sidebar needs, everything else stays in MongoDB.
+    """
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    user_id: PydanticObjectId
+    report_id: str
+    created_at: datetime
+    status: str
+
+
+async def report_history_list(curr_user, limit: int, after: Optional[str] = None):
+    query = {"user_id": curr_user.user_id}
+    if after:
+        if not ObjectId.is_valid(after):
+            return JSONResponse(
+                {"success": False, "message": "Invalid cursor"}, status_code=400
+            )
+        # Keyset pagination, newest first: continue below the last id seen
+        query["_id"] = {"$lt": ObjectId(after)}
+
+    limit = max(1, min(limit, config.REPORT_PAGE_MAX))
+
+    # One extra row tells whether there is a next page
+    cursor = ReportHistory.find(
+        query, projection_model=ReportHistoryItem, sort=[("_id", -1)], limit=limit + 1
+    )
+
+    async def stream_page():
+        yield '{"success": true, "message": "Report history list", "navigate": "/", "result": ['
+
+        count, last_id, next_cursor = 0, None, None
+        async for item in cursor:
+            if count == limit:
+                next_cursor = str(last_id)
+                break
+            yield ("," if count else "") + json.dumps(jsonable_encoder(item))
+            count, last_id = count + 1, item.id
+
+        yield '], "next_cursor": ' + json.dumps(next_cursor) + "}"
+
+    return StreamingResponse(stream_page(), media_type="application/json")
+
+
 async def report(report_id: str, curr_user):
     report = await ReportHistory.find_one({"report_id": report_id, "user_id": curr_user.user_id})
 
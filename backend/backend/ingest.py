@@ -0,0 +1,52 @@
+import argparse
+import logging
+
+from backend.config import main as config
+from backend.utils.vector_store import (
+    NumpyVectorStore,
+    build_astra_vector_store,
+    registry_fingerprint,
+)
+from backend.utils.embeddings import embedding_model_id
+from backend.utils.ingestion import ingest_registry
+
+logging.basicConfig(level=logging.INFO)
+
+
+def start_ingestion():
+    parser = argparse.ArgumentParser(
+        description="Embed the reference registry into the vector store"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["numpy", "astra"],
+        default=config.VECTOR_STORE_BACKEND,
+    )
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="remove records that are no longer in the registry",
+    )
+    args = parser.parse_args()
+
+    if args.backend == "astra":
+        # The Data API caps $in filters at 100 values
+        store = build_astra_vector_store()
+        stats = ingest_registry(store, min(args.chunk_size, 100), args.prune)
+    else:
+        store = NumpyVectorStore(config.VECTOR_STORE_PATH)
+        store.load()
+        stats = ingest_registry(store, args.chunk_size, args.prune)
+        store.fingerprint = f"{embedding_model_id()}:{registry_fingerprint()}"
+        store.save()
+
+    print(
+        f"scanned {stats['scanned']}, upserted {stats['upserted']}, "
+        f"skipped {stats['skipped']}, deleted {stats['deleted']} "
+        f"in {stats['seconds']}s ({stats['records_per_sec']} records/sec)"
+    )
+
+
+if __name__ == "__main__":
+    start_ingestion()
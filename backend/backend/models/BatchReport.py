@@ -0,0 +1,32 @@
+from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pydantic import Field
+from datetime import datetime
+
+from backend.constants import enums
+
+class BatchReport(Document):
+    user_id: PydanticObjectId
+    batch_id: str
+    
+    # One resume checked against every credential of the batch
+    validator_type: str
+    validator_path: str
+    report_ids: list[str] = Field(default_factory=list)
+    
+    # Aggregated credibility over the per-document reports
+    result: dict = Field(default_factory=dict)
+    timings: dict = Field(default_factory=dict)
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    status: enums.ReportStatus = Field(default=enums.ReportStatus.PENDING)
+    
+    class Settings:
+        name = "batch_report"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)]),
+            IndexModel([("batch_id", ASCENDING), ("user_id", ASCENDING)]),
+            # Unfinished batches picked up again at startup
+            IndexModel([("status", ASCENDING)]),
+        ]
@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
@@ -16,6 +17,18 @@ class ReportHistory(Document):
     validator_path: str
     
     result: dict
+    # Per-run breakdown: node / step seconds, LLM tokens, retrieval and OCR time
+    timings: dict = Field(default_factory=dict)
+    # Set when the report is one document of a batch
+    batch_id: Optional[str] = None
+
+    # Content hashes of the submitted files and the registry they were checked
+    # against; a resubmission of the same pair reuses the report
+    credential_sha256: Optional[str] = None
+    resume_sha256: Optional[str] = None
+    registry_version: Optional[str] = None
+    # report_id the result was copied from
+    reused_from: Optional[str] = None
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -23,5 +36,23 @@ class ReportHistory(Document):
     
     class Settings:
         name = "report_history"
+        indexes = [
+            # History list, newest first
+            IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)]),
+            IndexModel([("report_id", ASCENDING), ("user_id", ASCENDING)]),
+            # Unfinished reports picked up again at startup
+            IndexModel([("status", ASCENDING)]),
+            IndexModel([("batch_id", ASCENDING)]),
+            # Earlier report for the same files, newest first
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("credential_sha256", ASCENDING),
+                    ("resume_sha256", ASCENDING),
+                    ("registry_version", ASCENDING),
+                    ("_id", DESCENDING),
+                ]
+            ),
+        ]
 
     
\ No newline at end of file
@@ -2,6 +2,7 @@ from datetime import datetime
 from pydantic import Field
 from uuid import UUID
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, IndexModel
 
 
 class Token(Document):
@@ -15,3 +16,10 @@ class Token(Document):
 
     class Settings:
         name = "tokens"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("access_token", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("refresh_token", ASCENDING)]),
+            IndexModel([("session_id", ASCENDING)]),
+            # Sessions are removed by MongoDB once the refresh token has expired
+            IndexModel([("expiration_time", ASCENDING)], expireAfterSeconds=0),
+        ]
@@ -1,13 +1,13 @@
-from beanie import Document, PydanticObjectId
+from beanie import Document, Indexed, PydanticObjectId
 from pydantic import Field, EmailStr
-from typing import Optional
+from typing import Annotated, Optional
 from datetime import datetime
 from backend.constants.enums import UserStatus
 
 
 class User(Document):
     name: str = Field(default="")
-    email: EmailStr = Field(unique=True)
+    email: Annotated[EmailStr, Indexed(unique=True)]
     password: str = Field(default="")
     status: UserStatus = Field(default=UserStatus.ACTIVE)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Request, Depends, File, UploadFile
-from typing import Annotated
+from fastapi import APIRouter, Request, Depends, File, Form, UploadFile
+from typing import Annotated, Optional
 
 from backend.controller import main
+from backend.config import main as config
 from backend.validations import main as main_validator
 from backend.security.jsonwebtoken import get_current_user
 
@@ -18,17 +19,40 @@ async def signin(signin_data: main_validator.SigninValidator):
     return await main.signin(signin_data)
 
 
+@router.post("/signout")
+async def signout(curr_user = Depends(get_current_user)):
+    return await main.signout(curr_user)
+
+
 @router.post("/run-agent")
 async def run_agent(
     credential: UploadFile = File(...),
     resume: UploadFile = File(...),
+    force: bool = Form(default=False),
+    curr_user = Depends(get_current_user)
+):
+    return await main.run_agent(credential, resume, curr_user, force)
+
+@router.post("/run-batch")
+async def run_batch(
+    credentials: list[UploadFile] = File(default=[]),
+    resume: Optional[UploadFile] = File(default=None),
+    archive: Optional[UploadFile] = File(default=None),
     curr_user = Depends(get_current_user)
 ):
-    return await main.run_agent(credential, resume, curr_user)
+    return await main.run_batch(credentials, resume, archive, curr_user)
+
+@router.get("/batch/{batch_id}")
+async def batch_report(batch_id: str, curr_user = Depends(get_current_user)):
+    return await main.batch_report(batch_id, curr_user)
 
 @router.get("/report-history-list")
-async def report_history_list(curr_user = Depends(get_current_user)):
-    return await main.report_history_list(curr_user)
+async def report_history_list(
+    limit: int = config.REPORT_PAGE_SIZE,
+    after: Optional[str] = None,
+    curr_user = Depends(get_current_user)
+):
+    return await main.report_history_list(curr_user, limit, after)
 
 @router.get("/report/{report_id}")
 async def report(report_id: str, curr_user = Depends(get_current_user)):
@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.controller import jobs
+from backend.security.password import password_queue_depth
+from backend.utils.embeddings import embedding_cache_stats
+from backend.utils.file_reader import text_cache_stats
+from backend.utils.llm_cache import llm_cache_stats
+from backend.utils.metrics import Gauge, render_metrics
+
+router = APIRouter()
+
+Gauge("report_queue_depth", "Reports waiting for a worker.", jobs.queue_depth)
+Gauge(
+    "password_queue_depth",
+    "Password hash / check calls in flight.",
+    password_queue_depth,
+)
+Gauge(
+    "text_cache_hit_rate",
+    "Memory tier hit rate of the extracted text cache.",
+    lambda: text_cache_stats()["memory"]["hit_rate"],
+)
+Gauge(
+    "embedding_cache_hit_rate",
+    "Memory tier hit rate of the embedding cache.",
+    lambda: embedding_cache_stats()["memory"]["hit_rate"],
+)
+
+Gauge(
+    "llm_cache_hit_rate",
+    "Memory tier hit rate of the LLM response cache.",
+    lambda: llm_cache_stats()["memory"]["hit_rate"],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4"
+    )
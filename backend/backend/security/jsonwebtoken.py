@@ -1,4 +1,5 @@
 import logging
+from uuid import UUID
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
@@ -14,7 +15,9 @@ from backend.config.main import (
     JWT_REFRESH_EXPIRY,
     JWT_ACCESS_KEY,
     JWT_REFRESH_KEY,
+    SESSION_CACHE_TTL,
 )
+from backend.security.session_cache import get_session_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -67,6 +70,12 @@ async def verify_jwt_token(token: str, token_type: str) -> dict:
         if not id:
             raise credentials_exception
 
+        session_id = payload.get("session_id")
+        if session_id:
+            user_info = await get_cached_session(session_id, id, non_bearer)
+            if user_info:
+                return user_info
+
         user_info = await Token.find_one(
             {
                 "user_id": PydanticObjectId(id),
@@ -80,6 +89,9 @@ async def verify_jwt_token(token: str, token_type: str) -> dict:
         if not user_info:
             raise credentials_exception
 
+        if session_id:
+            await cache_session(session_id, user_info, payload["exp"])
+
         return user_info
 
     except JWTError as e:
@@ -90,5 +102,45 @@ async def verify_jwt_token(token: str, token_type: str) -> dict:
         raise credentials_exception
 
 
+async def get_cached_session(session_id: str, id: str, token: str) -> Token | None:
+    try:
+        cached = await get_session_cache().get(session_id)
+    except Exception as e:
+        # A cache outage only costs the Mongo lookup, never the request
+        logging.warning(f"Session cache read failed: {e}")
+        return None
+
+    if not cached:
+        return None
+
+    user_info = Token.model_validate_json(cached)
+    if str(user_info.user_id) != id or token not in (
+        user_info.access_token,
+        user_info.refresh_token,
+    ):
+        return None
+
+    return user_info
+
+
+async def cache_session(session_id: str, user_info: Token, exp: int) -> None:
+    ttl = min(SESSION_CACHE_TTL, exp - datetime.now(tz=timezone.utc).timestamp())
+    if ttl <= 0:
+        return
+
+    try:
+        await get_session_cache().set(session_id, user_info.model_dump_json(), ttl)
+    except Exception as e:
+        logging.warning(f"Session cache write failed: {e}")
+
+
+async def revoke_session(session_id: str) -> None:
+    """
+    Deletes the session's tokens and drops it from the session cache.
+    """
+    await Token.find(Token.session_id == UUID(session_id)).delete()
+    await get_session_cache().delete(session_id)
+
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData:
     return await verify_jwt_token(token, "access")
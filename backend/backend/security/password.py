@@ -0,0 +1,65 @@
+# security/password.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from backend.config import main as config
+
+# bcrypt releases the GIL while hashing, so a small thread pool is enough to
+# keep the deliberately slow work off the event loop
+_executor = ThreadPoolExecutor(
+    max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_lock = threading.Lock()
+_pending = 0
+
+
+class PasswordPoolBusyError(Exception):
+    pass
+
+
+def password_queue_depth() -> int:
+    """
+    Hash / check calls submitted and not finished yet, running ones included.
+    """
+    return _pending
+
+
+async def _run(fn, *args):
+    global _pending
+
+    with _lock:
+        if _pending >= config.PASSWORD_HASH_WORKERS + config.PASSWORD_HASH_QUEUE_SIZE:
+            raise PasswordPoolBusyError()
+        _pending += 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, fn, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+def _hash(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def _check(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def check_password(password: str, hashed_password: str) -> bool:
+    # The cost factor is read from the stored hash, old hashes keep verifying
+    return await _run(_check, password, hashed_password)
+
+
+def shutdown_password_pool() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,110 @@
+# security/session_cache.py
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from backend.config import main as config
+from backend.utils.cache import LRUCache
+
+
+class SessionCache(ABC):
+    """
+    Verified sessions keyed by `session_id`, so authenticated requests can skip
+    the token lookup in MongoDB. Values are the serialized token document.
+    """
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set(self, session_id: str, value: str, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class MemorySessionCache(SessionCache):
+    """
+    Per-process LRU. Sign-out only clears the worker that served it, other
+    workers keep the session until its TTL runs out.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    async def get(self, session_id: str) -> Optional[str]:
+        return self._cache.get(session_id)
+
+    async def set(self, session_id: str, value: str, ttl: float) -> None:
+        self._cache.set(session_id, value, ttl)
+
+    async def delete(self, session_id: str) -> None:
+        self._cache.delete(session_id)
+
+
+class RedisSessionCache(SessionCache):
+    """
+    Shared store for multi-worker deployments, revocations are seen by all
+    workers at once.
+    """
+
+    def __init__(self, url: str, prefix: str = "session:"):
+        # Optional dependency, only needed with SESSION_CACHE_BACKEND=redis
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                'SESSION_CACHE_BACKEND is "redis" but the redis package is not '
+                "installed, install the backend with the redis extra "
+                "(poetry install --extras redis)"
+            ) from e
+
+        self._client = redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    async def get(self, session_id: str) -> Optional[str]:
+        return await self._client.get(self._prefix + session_id)
+
+    async def set(self, session_id: str, value: str, ttl: float) -> None:
+        await self._client.set(self._prefix + session_id, value, px=int(ttl * 1000))
+
+    async def delete(self, session_id: str) -> None:
+        await self._client.delete(self._prefix + session_id)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_session_cache: Optional[SessionCache] = None
+
+
+def init_session_cache() -> SessionCache:
+    global _session_cache
+
+    if config.SESSION_CACHE_BACKEND == "redis":
+        _session_cache = RedisSessionCache(config.REDIS_URL)
+    else:
+        _session_cache = MemorySessionCache(config.SESSION_CACHE_ITEMS)
+
+    logging.info(f"Session cache initialized ({config.SESSION_CACHE_BACKEND})")
+    return _session_cache
+
+
+def get_session_cache() -> SessionCache:
+    if _session_cache is None:
+        return init_session_cache()
+    return _session_cache
+
+
+async def close_session_cache() -> None:
+    global _session_cache
+
+    if _session_cache is not None:
+        await _session_cache.close()
+        _session_cache = None
@@ -0,0 +1,151 @@
+# utils/access_log.py
+import json
+import queue
+import random
+import logging
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Request bodies are only captured for these, uploads are never buffered
+CAPTURED_CONTENT_TYPES = (b"application/json",)
+REDACTED_FIELDS = {
+    "password",
+    "confirm_password",
+    "access_token",
+    "refresh_token",
+    "token",
+    "authorization",
+}
+
+access_logger = logging.getLogger("backend.access")
+_listener: Optional[QueueListener] = None
+
+
+def start_access_log() -> None:
+    """
+    Routes access log records through a queue so formatting and writing them
+    happens on the listener thread, not on the event loop.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+
+    access_logger.addHandler(QueueHandler(log_queue))
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+
+
+def stop_access_log() -> None:
+    global _listener
+
+    if _listener is None:
+        return
+
+    _listener.stop()
+    for handler in list(access_logger.handlers):
+        if isinstance(handler, QueueHandler):
+            access_logger.removeHandler(handler)
+    _listener = None
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            key: "***" if key.lower() in REDACTED_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+class AccessLogMiddleware:
+    """
+    Logs method, path, status, latency and body sizes for sampled requests
+    (server errors are always logged). Small JSON request bodies can be
+    captured with credentials redacted; nothing else is read or copied.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = 1.0,
+        max_body_bytes: int = 0,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+
+    def _should_capture(self, scope) -> bool:
+        if self.max_body_bytes <= 0:
+            return False
+
+        headers = dict(scope["headers"])
+        content_type = headers.get(b"content-type", b"").split(b";")[0].strip()
+        content_length = headers.get(b"content-length")
+        return (
+            content_type in CAPTURED_CONTENT_TYPES
+            and content_length is not None
+            and int(content_length) <= self.max_body_bytes
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        sampled = random.random() < self.sample_rate
+        capture = sampled and self._should_capture(scope)
+        entry = {"status": 500, "request_bytes": 0, "response_bytes": 0}
+        body = []
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                entry["request_bytes"] += len(chunk)
+                if capture:
+                    body.append(chunk)
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                entry["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                entry["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if sampled or entry["status"] >= 500:
+                self._log(scope, entry, start, body)
+
+    def _log(self, scope, entry: dict, start: float, body: list) -> None:
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": entry["status"],
+            "duration_ms": round((time.perf_counter() - start) * 1e3, 2),
+            "request_bytes": entry["request_bytes"],
+            "response_bytes": entry["response_bytes"],
+        }
+        if scope.get("client"):
+            record["client"] = scope["client"][0]
+
+        if body:
+            try:
+                record["body"] = redact(json.loads(b"".join(body)))
+            except ValueError:
+                pass
+
+        access_logger.info(json.dumps(record))
@@ -0,0 +1,249 @@
+# utils/cache.py
+import os
+import time
+import asyncio
+import contextlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class CacheStats:
+    """
+    Hit / miss counters shared by the cache tiers.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class LRUCache:
+    """
+    Thread safe in-memory LRU with an optional per-entry TTL (seconds).
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: OrderedDict[str, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.stats.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """
+    Byte values stored one file per key under `directory`, evicting the least
+    recently used files once the total size goes over `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list:
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self.ttl is not None and stat.st_mtime + self.ttl <= time.time():
+                self.delete(key)
+                self.stats.misses += 1
+                return None
+
+            with open(path, "rb") as f:
+                value = f.read()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+
+        # Access time drives eviction, mtime stays the write time for the TTL.
+        # Another thread may have evicted the file since, the read still counts
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path, (time.time(), stat.st_mtime))
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(value)
+
+        with self._lock:
+            try:
+                self._size -= os.stat(path).st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._size += len(value)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            try:
+                size = os.stat(self._path(key)).st_size
+                os.remove(self._path(key))
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_atime)
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.stats.evictions += 1
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional disk tier. Values are converted to and
+    from bytes for the disk tier with `encode` / `decode`.
+    """
+
+    def __init__(
+        self,
+        memory: LRUCache,
+        disk: Optional[DiskCache] = None,
+        encode: Callable[[Any], bytes] = lambda value: value,
+        decode: Callable[[bytes], Any] = lambda value: value,
+    ):
+        self.memory = memory
+        self.disk = disk
+        self.encode = encode
+        self.decode = decode
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+
+        raw = self.disk.get(key)
+        if raw is None:
+            return None
+
+        value = self.decode(raw)
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, self.encode(value))
+
+    async def aget(self, key: str) -> Any:
+        """
+        `get` for the event loop: the disk tier is read on the default
+        executor, memory hits return without leaving the loop.
+        """
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+
+        loop = asyncio.get_running_loop()
+        raw = await loop.run_in_executor(None, self.disk.get, key)
+        if raw is None:
+            return None
+
+        value = self.decode(raw)
+        self.memory.set(key, value)
+        return value
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        `set` for the event loop, the disk write and eviction run on the
+        default executor.
+        """
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.disk.set, key, self.encode(value))
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats.as_dict()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats.as_dict()
+        return stats
@@ -1,14 +1,158 @@
 # utils/embeddings.py
-from backend.config import main as config
-from typing import List
+import asyncio
+import hashlib
+import re
+from typing import Callable, List, Optional
+
 import numpy as np
 
-# Example with LangChain's Google Generative AI embeddings
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from backend.config import main as config
+from backend.utils.cache import LRUCache, DiskCache, TieredCache
+
+# Shared LangChain Google Generative AI embeddings client
+from backend.config.clients import get_embedding_model
+
+
+class LocalEmbeddings:
+    """
+    Deterministic, offline embedding backend (signed feature hashing of word
+    unigrams and bigrams). Meant for tests and air-gapped runs, not quality.
+    """
+
+    def __init__(self, dimensions: int = 768):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = re.findall(r"\w+", text.lower())
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_query(self, text: str, **kwargs) -> List[float]:
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str], **kwargs) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str, **kwargs) -> List[float]:
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str], **kwargs) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+
+def embedding_model_id() -> str:
+    return f"{config.EMBEDDING_BACKEND}:{config.EMBEDDING_MODEL}"
+
+
+def _cache_key(text: str, task: str) -> str:
+    # Query and document embeddings differ for the same text, keep them apart
+    raw = f"{embedding_model_id()}\0{task}\0{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Embeddings keyed by model + content hash
+_embedding_cache = TieredCache(
+    LRUCache(maxsize=config.EMBEDDING_CACHE_ITEMS, ttl=config.EMBEDDING_CACHE_TTL),
+    (
+        DiskCache(
+            config.EMBEDDING_CACHE_DIR,
+            max_bytes=config.EMBEDDING_CACHE_MAX_BYTES,
+            ttl=config.EMBEDDING_CACHE_TTL,
+        )
+        if config.EMBEDDING_CACHE_DIR
+        else None
+    ),
+    encode=lambda vector: np.asarray(vector, dtype=np.float32).tobytes(),
+    decode=lambda raw: np.frombuffer(raw, dtype=np.float32).tolist(),
+)
+
+
+def embedding_cache_stats() -> dict:
+    return _embedding_cache.stats()
+
+
+class EmbeddingBatcher:
+    """
+    Groups concurrent single-text embedding requests into one batch call.
+    A batch is sent once it reaches `max_batch_size` texts or `window` seconds
+    after its first text arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int,
+        window: float,
+    ):
+        self.embed = embed
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, a running batch must
+        # not be collected while callers wait on its futures
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._pending, self._timer = loop, {}, None
+
+        # Identical texts waiting in the same batch share one slot
+        future = self._pending.get(text)
+        if future is None:
+            future = loop.create_future()
+            self._pending[text] = future
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
-# Initialize the embedding model (adjust this based on your provider)
-embedding_model = GoogleGenerativeAIEmbeddings(
-    model="models/embedding-001", google_api_key= config.GEMINI_API_KEY
+    async def _run(self, batch: dict[str, asyncio.Future]) -> None:
+        texts = list(batch)
+        try:
+            vectors = await self._loop.run_in_executor(None, self.embed, texts)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            if not batch[text].done():
+                batch[text].set_result(vector)
+
+
+def _embed_queries(texts: List[str]) -> List[List[float]]:
+    # Batched through embed_documents, but still embedded as retrieval queries
+    return get_embedding_model().embed_documents(texts, task_type="RETRIEVAL_QUERY")
+
+
+_batcher = EmbeddingBatcher(
+    _embed_queries,
+    max_batch_size=config.EMBEDDING_BATCH_SIZE,
+    window=config.EMBEDDING_BATCH_WINDOW_MS / 1000,
 )
 
 
@@ -16,11 +160,70 @@ def get_text_embedding(text: str) -> List[float]:
     """
     Generates an embedding for a single piece of text.
     """
-    return embedding_model.embed_query(text)
+    key = _cache_key(text, "query")
+    embedding = _embedding_cache.get(key)
+    if embedding is None:
+        embedding = get_embedding_model().embed_query(text)
+        _embedding_cache.set(key, embedding)
+    return embedding
 
 
 def get_batch_embeddings(texts: List[str]) -> List[List[float]]:
     """
-    Generates embeddings for a batch of texts.
+    Generates embeddings for a batch of texts, only sending cache misses.
+    """
+    keys = [_cache_key(text, "document") for text in texts]
+    embeddings = [_embedding_cache.get(key) for key in keys]
+
+    missing = sorted({text for text, e in zip(texts, embeddings) if e is None})
+    if missing:
+        fresh = dict(zip(missing, get_embedding_model().embed_documents(missing)))
+        for i, text in enumerate(texts):
+            if embeddings[i] is None:
+                embeddings[i] = fresh[text]
+                _embedding_cache.set(keys[i], fresh[text])
+
+    return embeddings
+
+
+async def aget_text_embedding(text: str) -> List[float]:
+    """
+    Async variant of `get_text_embedding`; concurrent callers are micro-batched.
+    """
+    key = _cache_key(text, "query")
+    embedding = await _embedding_cache.aget(key)
+    if embedding is None:
+        embedding = await _batcher.submit(text)
+        await _embedding_cache.aset(key, embedding)
+    return embedding
+
+
+async def aget_batch_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Async variant of `get_batch_embeddings`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_batch_embeddings, texts)
+
+
+async def aget_query_embeddings(texts: List[str]) -> List[List[float]]:
     """
-    return embedding_model.embed_documents(texts)
+    Query embeddings for several texts at once, with a single model call for
+    the cache misses instead of one batcher slot per text.
+    """
+    keys = [_cache_key(text, "query") for text in texts]
+    embeddings = list(await asyncio.gather(*(_embedding_cache.aget(key) for key in keys)))
+
+    missing = sorted({text for text, e in zip(texts, embeddings) if e is None})
+    if missing:
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(None, _embed_queries, missing)
+        fresh = dict(zip(missing, vectors))
+        stored = []
+        for i, text in enumerate(texts):
+            if embeddings[i] is None:
+                embeddings[i] = fresh[text]
+                stored.append(_embedding_cache.aset(keys[i], fresh[text]))
+        await asyncio.gather(*stored)
+
+    return embeddings
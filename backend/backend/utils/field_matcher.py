@@ -0,0 +1,251 @@
+# utils/field_matcher.py
+import re
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.utils.registry_index import (
+    normalize_date,
+    normalize_identifier,
+    present,
+    NAME_TITLES,
+)
+
+# consistency_report key -> (extracted field, label used in discrepancies)
+FIELDS = {
+    "name_match": ("name", "Name"),
+    "license_number_match": ("license_number", "License number"),
+    "institution_match": ("institution", "Institution"),
+    "certifying_body_match": ("certifying_body", "Certifying body"),
+    "issue_date_match": ("issue_date", "Issue date"),
+    "expiry_date_match": ("expiry_date", "Expiry date"),
+}
+
+# Words that say what kind of body it is rather than which one, so "Harvard"
+# and "Harvard Medical School" come down to the same distinctive token
+GENERIC_WORDS = {
+    "of", "the", "and", "for", "in", "at",
+    "university", "univ", "college", "school", "institute", "institution",
+    "medical", "medicine", "health", "sciences", "science", "hospital",
+    "council", "board", "commission", "national", "state", "centre", "center",
+}
+ACRONYM_SKIP = {"of", "the", "and", "for", "in", "at"}
+# Extra resume words allowed between the words of an organization name
+PHRASE_SLACK = 2
+
+DATE_PATTERN = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}(?:T[\d:.]+)?"
+    r"|\b\d{1,2}[/.-]\d{1,2}[/.-]\d{4}\b"
+    r"|\b\d{4}/\d{2}/\d{2}\b"
+    r"|\b\d{1,2} [A-Za-z]{3,9} \d{4}\b"
+    r"|\b[A-Za-z]{3,9} \d{1,2}, \d{4}\b"
+)
+# A year on its own, not part of a longer number or a "2002/05/8054" style
+# registration number; "(2015-2020)" and "in 2022." still count
+YEAR_PATTERN = re.compile(r"(?<![\d/])(?:19|20)\d{2}(?![\d/])")
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9/.-]*\d[A-Za-z0-9/.-]*")
+CAPITALIZED_RUN = re.compile(r"(?:[A-Z][\w&]*(?:\s+(?:of|the|and|for)\b)?\s*){2,}")
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def similarity_matrix(queries: list[str], candidates: list[str]) -> np.ndarray:
+    """
+    1 - Levenshtein distance / longer length for every (query, candidate)
+    pair. Each query is compared against all candidates at once: one NumPy
+    row update per query character, insertions closed with a running minimum.
+    """
+    scores = np.zeros((len(queries), len(candidates)))
+    if not queries or not candidates:
+        return scores
+
+    lengths = np.array([len(c) for c in candidates])
+    width = int(lengths.max())
+    codes = np.full((len(candidates), width), -1, dtype=np.int32)
+    for i, candidate in enumerate(candidates):
+        codes[i, : len(candidate)] = [ord(ch) for ch in candidate]
+
+    columns = np.arange(width + 1)
+    rows = np.arange(len(candidates))
+    for q, query in enumerate(queries):
+        previous = np.tile(columns, (len(candidates), 1))
+        for i, ch in enumerate(query, 1):
+            current = np.empty_like(previous)
+            current[:, 0] = i
+            current[:, 1:] = np.minimum(
+                previous[:, :-1] + (codes != ord(ch)), previous[:, 1:] + 1
+            )
+            previous = np.minimum.accumulate(current - columns, axis=1) + columns
+
+        distance = previous[rows, lengths]
+        scores[q] = 1 - distance / np.maximum(len(query), lengths)
+    return scores
+
+
+def token_score(tokens: list[str], resume_tokens: list[str]) -> float:
+    """
+    Mean over `tokens` of the best similarity to any resume token. Initials
+    match any resume token starting with the same letter.
+    """
+    if not tokens:
+        return 0.0
+
+    words = [t for t in tokens if len(t) > 1]
+    best = similarity_matrix(words, resume_tokens).max(axis=1, initial=0.0)
+    initials = [
+        1.0 if any(r.startswith(t) for r in resume_tokens) else 0.0
+        for t in tokens
+        if len(t) == 1
+    ]
+    return float(np.mean([*best, *initials]))
+
+
+def acronym(words: list[str]) -> str:
+    return "".join(w[0] for w in words if w.lower() not in ACRONYM_SKIP).upper()
+
+
+class ResumeIndex:
+    """
+    Everything the field scores look up in one resume, computed once.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = sorted(set(tokenize(text)))
+        # The resume's words in order, without connectives, as positions in
+        # `tokens` so phrase scores can reuse one similarity matrix
+        words = [t for t in tokenize(text) if t not in ACRONYM_SKIP]
+        position = {token: i for i, token in enumerate(self.tokens)}
+        self.sequence = np.array([position[t] for t in words], dtype=np.intp)
+        self.phrase_stream = f" {' '.join(words)} "
+        self.identifier_stream = normalize_identifier(text)
+        self.identifiers = sorted(
+            {normalize_identifier(m) for m in IDENTIFIER_PATTERN.findall(text)}
+        )
+
+        self.dates = {normalize_date(m) for m in DATE_PATTERN.findall(text)} - {""}
+        self.years = set(YEAR_PATTERN.findall(text)) | {d[:4] for d in self.dates}
+        self.acronyms = {
+            acronym(run.split()) for run in CAPITALIZED_RUN.findall(text)
+        } | {t.upper() for t in re.findall(r"\b[A-Z]{2,8}\b", text)}
+
+
+def phrase_score(tokens: list[str], resume: ResumeIndex) -> float:
+    """
+    How well `tokens` occur together in the resume: the best, over every
+    window of len(tokens) + PHRASE_SLACK consecutive resume words, of the mean
+    best similarity of each token within that window. Words scattered over
+    the resume do not add up the way they would in `token_score`.
+    """
+    if not tokens or not len(resume.sequence):
+        return 0.0
+
+    similarity = similarity_matrix(tokens, resume.tokens)[:, resume.sequence]
+    width = min(len(tokens) + PHRASE_SLACK, similarity.shape[1])
+    best_in_window = sliding_window_view(similarity, width, axis=1).max(axis=2)
+    return float(best_in_window.mean(axis=0).max())
+
+
+def score_name(value: str, resume: ResumeIndex) -> float:
+    tokens = [t for t in tokenize(value) if t not in NAME_TITLES]
+    return token_score(tokens, resume.tokens)
+
+
+def score_identifier(value: str, resume: ResumeIndex) -> float:
+    identifier = normalize_identifier(value)
+    if not identifier:
+        return 0.0
+    if identifier in resume.identifier_stream:
+        return 1.0
+    return float(
+        similarity_matrix([identifier], resume.identifiers).max(initial=0.0)
+    )
+
+
+# Plausible but not proof, e.g. only the year of a date or only the place name
+# of an organization. Sits between the default CROSSCHECK_MISMATCH_SCORE and
+# CROSSCHECK_MATCH_SCORE, so the LLM decides
+UNCERTAIN_SCORE = 0.7
+
+
+def score_organization(value: str, resume: ResumeIndex) -> float:
+    words = re.findall(r"[A-Za-z0-9&]+", value)
+    # "AIIMS" on one side, "All India Institute of Medical Sciences" on the other
+    if len(words) > 1 and len(acronym(words)) > 2 and acronym(words) in resume.acronyms:
+        return 1.0
+    if len(words) == 1 and value.isupper() and value in resume.acronyms:
+        return 1.0
+
+    tokens = [t for t in tokenize(value) if t not in ACRONYM_SKIP]
+    if not tokens:
+        return 0.0
+    # The whole name, word for word
+    if len(tokens) > 1 and f" {' '.join(tokens)} " in resume.phrase_stream:
+        return 1.0
+
+    distinctive = [t for t in tokens if t not in GENERIC_WORDS]
+    if len(distinctive) > 1:
+        return phrase_score(distinctive, resume)
+    # A place name ("Medical Council of India") or a generic word ("Board")
+    # alone does not identify the body
+    return min(phrase_score(distinctive or tokens, resume), UNCERTAIN_SCORE)
+
+
+def score_date(value: str, resume: ResumeIndex) -> float:
+    date = normalize_date(value)
+    if not date:
+        # Not a full date, a year is still comparable
+        years = YEAR_PATTERN.findall(str(value))
+        return UNCERTAIN_SCORE if years and years[0] in resume.years else 0.0
+    if date in resume.dates:
+        return 1.0
+    # Resumes mostly give years only
+    return UNCERTAIN_SCORE if date[:4] in resume.years else 0.0
+
+
+SCORERS = {
+    "name_match": score_name,
+    "license_number_match": score_identifier,
+    "institution_match": score_organization,
+    "certifying_body_match": score_organization,
+    "issue_date_match": score_date,
+    "expiry_date_match": score_date,
+}
+
+
+def match_fields(
+    extracted: dict, resume_text: str, match: float, mismatch: float
+) -> dict:
+    """
+    Scores every credential field against the resume. A score of at least
+    `match` is a match, below `mismatch` a mismatch, anything in between is
+    listed under `ambiguous` for the LLM to decide. Fields the credential
+    does not have (a degree has no expiry date) are not applicable and left
+    out of the report.
+    """
+    resume = ResumeIndex(resume_text)
+    report, scores, discrepancies, ambiguous = {}, {}, [], []
+
+    for key, (field, label) in FIELDS.items():
+        value = extracted.get(field)
+        if not present(value):
+            continue
+
+        score = SCORERS[key](str(value), resume)
+        scores[key] = round(score, 3)
+        if score >= match:
+            report[key] = True
+        elif score < mismatch:
+            report[key] = False
+            discrepancies.append(f"{label} '{value}' is not mentioned in the resume")
+        else:
+            report[key] = None
+            ambiguous.append(key)
+
+    return {
+        "consistency_report": report,
+        "discrepancies": discrepancies,
+        "scores": scores,
+        "ambiguous": ambiguous,
+    }
@@ -1,38 +1,134 @@
+import io
 import os
+import time
+import asyncio
+import hashlib
+import contextvars
 import mimetypes
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image
-import pytesseract
-import fitz  # PyMuPDF
+
+from backend.config import main as config
+from backend.utils.cache import LRUCache, DiskCache, TieredCache
+from backend.utils.metrics import track_extraction, record_ocr
+from backend.utils.pdf import extract_pdf_text, shutdown_pdf_pool
+from backend.utils.ocr import ocr_pages, shutdown_ocr
+
+# Bounded pool for OCR / PDF parsing so it never runs on the event loop
+_executor = ThreadPoolExecutor(
+    max_workers=config.FILE_READER_WORKERS, thread_name_prefix="file-reader"
+)
+
+
+async def aread_file_safely(file_path: str) -> str:
+    loop = asyncio.get_running_loop()
+    # Context is copied so OCR time lands on the report that triggered it
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, context.run, read_file_safely, file_path
+    )
+
+
+def shutdown_file_reader() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+    shutdown_pdf_pool()
+    shutdown_ocr()
+
+
+# Bump whenever extraction output changes so stale cached text is ignored
+EXTRACTOR_VERSION = "3"
+
+# Extracted text keyed by the SHA-256 of the uploaded bytes
+_text_cache = TieredCache(
+    LRUCache(maxsize=config.TEXT_CACHE_MEMORY_ITEMS),
+    (
+        DiskCache(config.TEXT_CACHE_DIR, max_bytes=config.TEXT_CACHE_MAX_BYTES)
+        if config.TEXT_CACHE_MAX_BYTES > 0
+        else None
+    ),
+    encode=lambda text: text.encode("utf-8"),
+    decode=lambda raw: raw.decode("utf-8"),
+)
+
+
+def text_cache_stats() -> dict:
+    return _text_cache.stats()
+
 
 def read_file_safely(file_path: str) -> str:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    mime_type, _ = mimetypes.guess_type(file_path)
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    return read_bytes_safely(data, file_path)
+
+
+def read_bytes_safely(data: bytes, file_name: str, digest: Optional[str] = None) -> str:
+    """
+    Extracts text from an already loaded document. `file_name` only picks the
+    extractor, `digest` is the SHA-256 of `data` when the caller already has it.
+    """
+    digest = digest or hashlib.sha256(data).hexdigest()
+    cache_key = f"{digest}-v{EXTRACTOR_VERSION}"
+    text = _text_cache.get(cache_key)
+    if text is not None:
+        return text
+
+    text = extract_text(data, file_name)
+    _text_cache.set(cache_key, text)
+    return text
+
+
+async def aread_upload(
+    file_path: str, data: Optional[bytes] = None, digest: Optional[str] = None
+) -> str:
+    """
+    Reads a document from the bytes kept at upload time, falling back to the
+    stored file when they are not available (e.g. a re-queued report).
+    """
+    if data is None:
+        return await aread_file_safely(file_path)
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, context.run, read_bytes_safely, data, file_path, digest
+    )
+
+
+def document_kind(file_name: str) -> str:
+    mime_type, _ = mimetypes.guess_type(file_name)
 
     if mime_type is None:
-        ext = os.path.splitext(file_path)[1].lower()
+        ext = os.path.splitext(file_name)[1].lower()
         if ext in [".pdf"]:
-            return extract_text_from_pdf(file_path)
+            return "pdf"
         elif ext in [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]:
-            return extract_text_from_image(file_path)
-        else:
-            return extract_text_from_generic(file_path)
-
-    if mime_type.startswith("text"):
-        return extract_text_from_generic(file_path)
-    elif mime_type == "application/pdf":
-        return extract_text_from_pdf(file_path)
+            return "image"
+        return "text"
+
+    if mime_type == "application/pdf":
+        return "pdf"
     elif mime_type.startswith("image"):
-        return extract_text_from_image(file_path)
-    else:
-        return extract_text_from_generic(file_path)
+        return "image"
+    return "text"
 
-def extract_text_from_generic(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        raw = f.read()
 
+def extract_text(data: bytes, file_name: str) -> str:
+    kind = document_kind(file_name)
+
+    with track_extraction(kind):
+        if kind == "pdf":
+            return extract_text_from_pdf(data)
+        elif kind == "image":
+            return extract_text_from_image(data)
+        return extract_text_from_generic(data)
+
+def extract_text_from_generic(raw: bytes) -> str:
     try:
         return raw.decode("utf-8")
     except UnicodeDecodeError:
@@ -41,13 +137,15 @@ def extract_text_from_generic(file_path: str) -> str:
         except UnicodeDecodeError:
             return raw.decode("utf-8", errors="replace")
 
-def extract_text_from_pdf(file_path: str) -> str:
-    doc = fitz.open(file_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text.strip()
+def extract_text_from_pdf(data: bytes) -> str:
+    text, ocr_seconds = extract_pdf_text(data)
+    if ocr_seconds:
+        record_ocr(ocr_seconds)
+    return text
 
-def extract_text_from_image(file_path: str) -> str:
-    image = Image.open(file_path)
-    return pytesseract.image_to_string(image)
+def extract_text_from_image(data: bytes) -> str:
+    image = Image.open(io.BytesIO(data))
+    start = time.perf_counter()
+    text = ocr_pages([image])
+    record_ocr(time.perf_counter() - start)
+    return text
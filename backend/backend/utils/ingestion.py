@@ -0,0 +1,71 @@
+# utils/ingestion.py
+import time
+import hashlib
+import logging
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from backend.utils.embeddings import get_batch_embeddings, embedding_model_id
+from backend.utils.vector_store import VectorStore, iter_registry_records
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def record_hash(text: str) -> str:
+    # Includes the model so switching embedding models re-embeds everything
+    return hashlib.sha256(f"{embedding_model_id()}\0{text}".encode("utf-8")).hexdigest()
+
+
+def ingest_registry(
+    store: VectorStore, chunk_size: int = 50, prune: bool = False
+) -> dict:
+    """
+    Streams the registry records into `store` in chunks. Each chunk costs one
+    hash lookup, one batched embedding call for the new / changed records and
+    one bulk upsert; records whose content hash is unchanged are skipped.
+    With `prune`, records no longer present in the registry are removed.
+    """
+    start = time.perf_counter()
+    stats = {"scanned": 0, "skipped": 0, "upserted": 0, "deleted": 0}
+    seen = set()
+
+    for chunk in iter_chunks(iter_registry_records(), chunk_size):
+        ids = [doc_id for doc_id, _ in chunk]
+        texts = [text for _, text in chunk]
+        hashes = [record_hash(text) for text in texts]
+        seen.update(ids)
+
+        existing = store.content_hashes(ids)
+        changed = [i for i, doc_id in enumerate(ids) if existing.get(doc_id) != hashes[i]]
+
+        stats["scanned"] += len(chunk)
+        stats["skipped"] += len(chunk) - len(changed)
+
+        if not changed:
+            continue
+
+        changed_texts = [texts[i] for i in changed]
+        store.upsert(
+            [ids[i] for i in changed],
+            changed_texts,
+            get_batch_embeddings(changed_texts),
+            [hashes[i] for i in changed],
+        )
+        stats["upserted"] += len(changed)
+
+    if prune:
+        stale = [doc_id for doc_id in store.all_ids() if doc_id not in seen]
+        if stale:
+            store.delete(stale)
+        stats["deleted"] = len(stale)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["records_per_sec"] = round(stats["scanned"] / elapsed, 1) if elapsed else 0.0
+
+    logging.info(f"Registry ingestion finished: {stats}")
+    return stats
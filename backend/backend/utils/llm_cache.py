@@ -0,0 +1,188 @@
+# utils/llm_cache.py
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from backend.config import main as config
+from backend.config.clients import get_llm
+from backend.utils.cache import LRUCache, DiskCache, TieredCache
+from backend.utils.metrics import llm_cache_requests, track_llm, record_llm_usage
+
+# Responses keyed by model + normalized prompt. Entries carry their own expiry
+# so per-agent TTLs hold on the disk tier too.
+_response_cache = TieredCache(
+    LRUCache(maxsize=config.LLM_CACHE_ITEMS),
+    (
+        DiskCache(config.LLM_CACHE_DIR, max_bytes=config.LLM_CACHE_MAX_BYTES)
+        if config.LLM_CACHE_DIR and config.LLM_CACHE_MAX_BYTES
+        else None
+    ),
+    encode=lambda entry: json.dumps(entry).encode("utf-8"),
+    decode=lambda raw: json.loads(raw.decode("utf-8")),
+)
+
+# Upstream calls in progress, shared by identical prompts arriving meanwhile
+_in_flight: dict[str, asyncio.Future] = {}
+_in_flight_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def llm_cache_stats() -> dict:
+    return _response_cache.stats()
+
+
+def agent_ttl(agent: str) -> int:
+    return config.LLM_CACHE_AGENT_TTLS.get(agent, config.LLM_CACHE_TTL)
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Indentation and blank lines of the f-string templates carry no meaning
+    return " ".join(prompt.split())
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    raw = f"{model}\0{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_json(content: str) -> bool:
+    try:
+        json.loads(content.strip())
+        return True
+    except ValueError:
+        return False
+
+
+class _FetchAbandoned(Exception):
+    """
+    Set on a shared future when its owner was cancelled before the response
+    came back; callers waiting on it fetch the prompt themselves.
+    """
+
+
+def _shared_future(key: str) -> tuple[asyncio.Future, bool]:
+    global _in_flight, _in_flight_loop
+
+    loop = asyncio.get_running_loop()
+    if loop is not _in_flight_loop:
+        _in_flight, _in_flight_loop = {}, loop
+
+    future = _in_flight.get(key)
+    if future is not None:
+        return future, False
+
+    future = loop.create_future()
+    _in_flight[key] = future
+    return future, True
+
+
+async def _through_cache(
+    agent: str,
+    key: str,
+    ttl: int,
+    fetch: Callable[[], Awaitable[tuple[str, Any]]],
+    cacheable: Callable[[str], bool],
+) -> tuple[str, Any]:
+    """
+    Cached text for `key`, or the (text, result) of one `fetch()` shared by
+    every concurrent caller. `result` is None unless this caller fetched.
+    """
+    entry = await _response_cache.aget(key)
+    if entry is not None and entry["expires_at"] > time.time():
+        llm_cache_requests.inc(agent=agent, outcome="hit")
+        return entry["content"], None
+
+    while True:
+        future, owner = _shared_future(key)
+        if owner:
+            break
+
+        llm_cache_requests.inc(agent=agent, outcome="shared")
+        try:
+            return await asyncio.shield(future), None
+        except _FetchAbandoned:
+            # The caller that owned the fetch went away, take over
+            continue
+
+    llm_cache_requests.inc(agent=agent, outcome="miss")
+    try:
+        text, result = await fetch()
+        future.set_result(text)
+    except Exception as e:
+        future.set_exception(e)
+        # Marks it retrieved, nobody may be waiting on this prompt
+        future.exception()
+        raise
+    except BaseException:
+        # Cancelling this caller must not cancel the others sharing the prompt
+        future.set_exception(_FetchAbandoned())
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+    if isinstance(text, str) and cacheable(text):
+        await _response_cache.aset(
+            key, {"content": text, "expires_at": time.time() + ttl}, ttl
+        )
+    return text, result
+
+
+def _model_name(llm) -> str:
+    return getattr(llm, "model", None) or config.GEMINI_MODEL
+
+
+async def cached_ainvoke(
+    agent: str, prompt: str, cacheable: Callable[[str], bool] = is_json
+) -> AIMessage:
+    """
+    `get_llm().ainvoke(prompt)` through the response cache. Concurrent
+    identical prompts share one upstream call, and a response is only stored
+    when `cacheable(content)` accepts it, so a malformed answer is asked for
+    again rather than replayed. Cached responses carry no token usage.
+    """
+    llm = get_llm()
+
+    async def fetch() -> tuple[str, AIMessage]:
+        with track_llm(agent):
+            response = await llm.ainvoke(prompt)
+        record_llm_usage(agent, response)
+        return response.content, response
+
+    ttl = agent_ttl(agent)
+    if ttl <= 0:
+        return (await fetch())[1]
+
+    key = prompt_key(_model_name(llm), prompt)
+    content, response = await _through_cache(agent, key, ttl, fetch, cacheable)
+    return response if response is not None else AIMessage(content=content)
+
+
+async def cached_astructured(agent: str, prompt: str, schema: Type[BaseModel]) -> BaseModel:
+    """
+    One structured-output (function calling) call returning a validated
+    `schema` instance, through the same cache as `cached_ainvoke`. Raises
+    ValueError when the model does not produce a valid instance.
+    """
+    llm = get_llm()
+    structured = llm.with_structured_output(schema, include_raw=True)
+
+    async def fetch() -> tuple[str, BaseModel]:
+        with track_llm(agent):
+            output = await structured.ainvoke(prompt)
+        record_llm_usage(agent, output["raw"])
+        if output["parsed"] is None:
+            raise ValueError(f"Invalid structured output: {output['parsing_error']}")
+        return output["parsed"].model_dump_json(), output["parsed"]
+
+    ttl = agent_ttl(agent)
+    if ttl <= 0:
+        return (await fetch())[1]
+
+    key = prompt_key(f"{_model_name(llm)}:{schema.__name__}", prompt)
+    text, parsed = await _through_cache(agent, key, ttl, fetch, lambda text: True)
+    return parsed if parsed is not None else schema.model_validate_json(text)
@@ -0,0 +1,264 @@
+# utils/metrics.py
+import time
+import bisect
+import inspect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Seconds; pipeline steps range from sub-millisecond lookups to long LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_metrics: list = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    Value read from `fn` at scrape time.
+    """
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        _metrics.append(self)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.fn()}",
+        ]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> (per-bucket counts, +Inf count, sum)
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, (counts, total, value_sum) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = _format_labels(self.labels, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {total}")
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}_sum{labels} {value_sum}")
+                lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+node_seconds = Histogram(
+    "agent_node_seconds", "Wall time of agent pipeline nodes and steps.", ("node",)
+)
+llm_request_seconds = Histogram(
+    "llm_request_seconds", "Latency of LLM calls.", ("agent",)
+)
+llm_tokens = Counter(
+    "llm_tokens_total", "LLM tokens used, by agent and kind.", ("agent", "kind")
+)
+retrieval_seconds = Histogram(
+    "retrieval_seconds", "Latency of vector store searches.", ("agent",)
+)
+extraction_seconds = Histogram(
+    "document_extraction_seconds", "Text extraction time per document.", ("kind",)
+)
+ocr_seconds = Histogram("ocr_seconds", "Tesseract OCR time per image.")
+report_submissions = Counter(
+    "report_submissions_total",
+    "Report submissions: queued (new), answered with an earlier result (reused) or joined to a run in progress.",
+    ("outcome",),
+)
+llm_cache_requests = Counter(
+    "llm_cache_requests_total",
+    "LLM calls by agent: served from cache (hit), joined an identical call in flight (shared) or sent upstream (miss).",
+    ("agent", "outcome"),
+)
+crosscheck_decisions = Counter(
+    "crosscheck_decisions_total",
+    "Cross-checks settled by the local field matcher or sent to the LLM.",
+    ("decided_by",),
+)
+registry_lookups = Counter(
+    "registry_index_lookups_total",
+    "Exact-match registry lookups: hit, conflict (identifier known, details differ) or miss.",
+    ("outcome",),
+)
+
+
+# Breakdown of the pipeline run in progress, shared by the tasks it spawns
+_run_stats: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "run_stats", default=None
+)
+
+
+def start_run() -> dict:
+    stats = {
+        "steps": {},
+        "llm": {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0},
+        "retrieval_seconds": 0.0,
+        "extraction_seconds": 0.0,
+        "ocr_seconds": 0.0,
+    }
+    _run_stats.set(stats)
+    return stats
+
+
+def _add_to_run(key: str, seconds: float) -> None:
+    stats = _run_stats.get()
+    if stats is not None:
+        stats[key] = round(stats[key] + seconds, 4)
+
+
+def record_step(name: str, seconds: float) -> None:
+    node_seconds.observe(seconds, node=name)
+    stats = _run_stats.get()
+    if stats is not None:
+        stats["steps"][name] = round(stats["steps"].get(name, 0) + seconds, 4)
+
+
+def instrument(name: str, node: Callable) -> Callable:
+    """
+    Wraps a graph node so its wall time is recorded under `name`.
+    """
+
+    async def run(state):
+        start = time.perf_counter()
+        try:
+            update = node(state)
+            if inspect.isawaitable(update):
+                update = await update
+            return update
+        finally:
+            record_step(name, time.perf_counter() - start)
+
+    return run
+
+
+@contextmanager
+def track_retrieval(agent: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        retrieval_seconds.observe(seconds, agent=agent)
+        _add_to_run("retrieval_seconds", seconds)
+
+
+@contextmanager
+def track_extraction(kind: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        extraction_seconds.observe(seconds, kind=kind)
+        _add_to_run("extraction_seconds", seconds)
+
+
+def record_ocr(seconds: float) -> None:
+    ocr_seconds.observe(seconds)
+    _add_to_run("ocr_seconds", seconds)
+
+
+@contextmanager
+def track_llm(agent: str):
+    """
+    Times an LLM call; the caller passes the response to `record_llm_usage`.
+    """
+    with llm_request_seconds.time(agent=agent):
+        yield
+
+
+def record_llm_usage(agent: str, response) -> None:
+    usage = getattr(response, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens", 0)
+    completion_tokens = usage.get("output_tokens", 0)
+
+    llm_tokens.inc(prompt_tokens, agent=agent, kind="prompt")
+    llm_tokens.inc(completion_tokens, agent=agent, kind="completion")
+
+    stats = _run_stats.get()
+    if stats is not None:
+        stats["llm"]["calls"] += 1
+        stats["llm"]["prompt_tokens"] += prompt_tokens
+        stats["llm"]["completion_tokens"] += completion_tokens
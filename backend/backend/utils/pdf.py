@@ -0,0 +1,154 @@
+# utils/pdf.py
+import io
+import time
+import logging
+import multiprocessing
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+import fitz  # PyMuPDF
+
+from backend.config import main as config
+from backend.utils.ocr import document_deadline, ocr_image, ocr_page_texts
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+
+    if _process_pool is None:
+        # Spawned, forking a process that runs threads and an event loop is unsafe
+        _process_pool = ProcessPoolExecutor(
+            max_workers=config.PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _process_pool
+
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def is_image_only(page: fitz.Page, text: str, min_chars: int) -> bool:
+    """
+    Scanned pages have no (or only a stray) text layer but carry an image.
+    """
+    return len(text.strip()) < min_chars and bool(page.get_images(full=False))
+
+
+def render_page(page: fitz.Page, dpi: int) -> Image.Image:
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return Image.open(io.BytesIO(pixmap.tobytes("png")))
+
+
+def ocr_page(page: fitz.Page, dpi: int, deadline: Optional[float]) -> str:
+    return ocr_image(render_page(page, dpi), deadline)
+
+
+def extract_page_range(
+    data: bytes,
+    start: int,
+    stop: int,
+    ocr_dpi: int,
+    min_chars: int,
+    deadline: Optional[float] = None,
+) -> tuple[list[str], float]:
+    """
+    Texts of pages [start, stop) and the seconds spent on OCR. Runs in the
+    worker processes, so it only takes plain arguments.
+    """
+    texts = []
+    ocr_seconds = 0.0
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for number in range(start, stop):
+            page = doc[number]
+            text = page.get_text()
+            if is_image_only(page, text, min_chars):
+                ocr_start = time.perf_counter()
+                text = ocr_page(page, ocr_dpi, deadline)
+                ocr_seconds += time.perf_counter() - ocr_start
+            texts.append(text.strip())
+
+    return texts, ocr_seconds
+
+
+def extract_pages(
+    data: bytes,
+    page_count: int,
+    ocr_dpi: int,
+    min_chars: int,
+    deadline: Optional[float] = None,
+) -> tuple[list[str], float]:
+    """
+    `extract_page_range` over the first `page_count` pages in this process:
+    the image-only pages are rendered first, then OCRed together on the
+    shared OCR pool.
+    """
+    texts, scanned = [], {}
+    ocr_seconds = 0.0
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for number in range(page_count):
+            page = doc[number]
+            text = page.get_text()
+            if is_image_only(page, text, min_chars):
+                render_start = time.perf_counter()
+                scanned[number] = render_page(page, ocr_dpi)
+                ocr_seconds += time.perf_counter() - render_start
+                text = ""
+            texts.append(text.strip())
+
+    if scanned:
+        ocr_start = time.perf_counter()
+        images = list(scanned.values())
+        for number, text in zip(scanned, ocr_page_texts(images, deadline)):
+            texts[number] = text
+        ocr_seconds += time.perf_counter() - ocr_start
+
+    return texts, ocr_seconds
+
+
+def page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf_text(data: bytes) -> tuple[str, float]:
+    """
+    Text of the first PDF_MAX_PAGES pages, one page per paragraph, and the
+    OCR seconds spent on image-only pages. Long documents are split into page
+    ranges extracted in parallel worker processes.
+    """
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        total_pages = doc.page_count
+
+    page_count = min(total_pages, config.PDF_MAX_PAGES)
+    if page_count < total_pages:
+        logging.warning(
+            f"PDF has {total_pages} pages, only the first {page_count} are read"
+        )
+
+    # One OCR time budget for the whole document, shared by the workers
+    args = (config.PDF_OCR_DPI, config.PDF_OCR_MIN_CHARS, document_deadline())
+    if page_count < config.PDF_PARALLEL_MIN_PAGES or config.PDF_WORKERS < 2:
+        texts, ocr_seconds = extract_pages(data, page_count, *args)
+    else:
+        ranges = page_ranges(page_count, config.PDF_WORKERS)
+        futures = [
+            _get_process_pool().submit(extract_page_range, data, start, stop, *args)
+            for start, stop in ranges
+        ]
+        texts, ocr_seconds = [], 0.0
+        for future in futures:
+            range_texts, range_ocr = future.result()
+            texts.extend(range_texts)
+            ocr_seconds += range_ocr
+
+    return "\n\n".join(text for text in texts if text), ocr_seconds
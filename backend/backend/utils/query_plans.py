@@ -0,0 +1,113 @@
+# utils/query_plans.py
+import logging
+from uuid import uuid4
+
+from beanie import PydanticObjectId
+from bson import Binary
+
+from backend.constants.enums import ReportStatus
+from backend.controller.agent import PREVIOUS_REPORT_SORT, previous_report_query
+from backend.models.User import User
+from backend.models.Token import Token
+from backend.models.ReportHistory import ReportHistory
+from backend.models.BatchReport import BatchReport
+
+
+class CollectionScanError(Exception):
+    pass
+
+
+def hot_queries() -> list:
+    """
+    (name, model, filter, sort) for the queries run on every request or poll.
+    Only the shape matters to the planner, the values are placeholders.
+    """
+    user_id = PydanticObjectId()
+    return [
+        (
+            "token by user + token",
+            Token,
+            {
+                "user_id": user_id,
+                "$or": [{"access_token": ""}, {"refresh_token": ""}],
+            },
+            None,
+        ),
+        ("token by session", Token, {"session_id": Binary.from_uuid(uuid4())}, None),
+        ("user by email", User, {"email": ""}, None),
+        ("report history list", ReportHistory, {"user_id": user_id}, [("_id", -1)]),
+        (
+            "report by id",
+            ReportHistory,
+            {"report_id": "", "user_id": user_id},
+            None,
+        ),
+        (
+            "unfinished reports",
+            ReportHistory,
+            {
+                "status": {
+                    "$in": [ReportStatus.PENDING.value, ReportStatus.PROCESSING.value]
+                },
+                "batch_id": None,
+            },
+            None,
+        ),
+        (
+            "previous report for the same files",
+            ReportHistory,
+            previous_report_query(
+                user_id,
+                {"credential_sha256": "", "resume_sha256": "", "registry_version": ""},
+            ),
+            PREVIOUS_REPORT_SORT,
+        ),
+        ("batch by id", BatchReport, {"batch_id": "", "user_id": user_id}, None),
+        (
+            "reports of a batch",
+            ReportHistory,
+            {"batch_id": "", "user_id": user_id},
+            None,
+        ),
+        (
+            "unfinished batches",
+            BatchReport,
+            {
+                "status": {
+                    "$in": [ReportStatus.PENDING.value, ReportStatus.PROCESSING.value]
+                }
+            },
+            None,
+        ),
+    ]
+
+
+def _has_collscan(plan) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(value) for value in plan)
+    return False
+
+
+async def check_query_plans() -> None:
+    """
+    Explains every hot query and raises if any of them would scan a whole
+    collection, i.e. a declared index is missing or no longer matches.
+    """
+    failures = []
+    for name, model, query, sort in hot_queries():
+        cursor = model.get_motor_collection().find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        explain = await cursor.explain()
+        if _has_collscan(explain["queryPlanner"]["winningPlan"]):
+            failures.append(name)
+
+    if failures:
+        raise CollectionScanError(f"Queries without an index: {', '.join(failures)}")
+
+    logging.info("Query plans checked, all hot queries use an index")
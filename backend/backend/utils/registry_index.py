@@ -0,0 +1,180 @@
+# utils/registry_index.py
+import re
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+from backend.utils.vector_store import iter_registry_records
+
+# Where the registry files and the extractor keep each kind of value
+IDENTIFIER_FIELDS = (
+    "certificate_id",
+    "registration_number",
+    "license_number",
+    "certificate_number",
+)
+NAME_FIELDS = ("name", "doctor_name")
+ISSUE_DATE_FIELDS = (
+    "issue_date",
+    "issued_date",
+    "issued_on",
+    "certificate_issue_date",
+    "date_of_issue",
+)
+EXPIRY_DATE_FIELDS = ("expiry_date", "valid_till", "valid_until", "valid_through")
+
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+)
+NAME_TITLES = {"dr", "prof", "mr", "mrs", "ms"}
+# Placeholders the extractor writes for a field the document does not have
+MISSING_VALUES = {"", "...", "null", "none", "n/a"}
+
+
+def present(value) -> bool:
+    return value is not None and str(value).strip().lower() not in MISSING_VALUES
+
+
+def normalize_identifier(value) -> str:
+    # "IND-376845", "ind 376845" and "IND376845" are the same number
+    return re.sub(r"[^0-9A-Z]", "", str(value or "").upper())
+
+
+def normalize_name(value) -> str:
+    # Word order and titles vary between a certificate and the registry
+    tokens = re.findall(r"[a-z]+", str(value or "").lower())
+    return " ".join(sorted(token for token in tokens if token not in NAME_TITLES))
+
+
+def normalize_date(value) -> str:
+    text = str(value or "").strip()
+    # ISO timestamps ("2022-10-08T00:00:00.000") only need their date part
+    text = text.split("T")[0] if re.match(r"\d{4}-\d{2}-\d{2}T", text) else text
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return ""
+
+
+def first_value(record: dict, fields: tuple, normalize) -> str:
+    for field in fields:
+        value = normalize(record.get(field))
+        if value:
+            return value
+    return ""
+
+
+# Details that have to agree with the record an identifier points at
+CONFIRMING_FIELDS = {
+    "name": (NAME_FIELDS, normalize_name),
+    "issue_date": (ISSUE_DATE_FIELDS, normalize_date),
+    "expiry_date": (EXPIRY_DATE_FIELDS, normalize_date),
+}
+
+
+class RegistryIndex:
+    """
+    Hash index over the hard identifiers of every registry record, with the
+    normalized name and issue date kept next to each record to confirm a hit.
+    """
+
+    def __init__(self):
+        self.records: list[dict] = []
+        self._by_identifier: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record_id: str, record: dict, text: str) -> None:
+        position = len(self.records)
+        self.records.append(
+            {
+                "id": record_id,
+                "text": text,
+                **{
+                    key: first_value(record, fields, normalize)
+                    for key, (fields, normalize) in CONFIRMING_FIELDS.items()
+                },
+            }
+        )
+
+        identifiers = {normalize_identifier(record.get(f)) for f in IDENTIFIER_FIELDS}
+        for identifier in identifiers - {""}:
+            self._by_identifier.setdefault(identifier, []).append(position)
+
+    def candidates(self, extracted: dict) -> list[dict]:
+        """
+        Records sharing any identifier with the extracted credential.
+        """
+        positions = set()
+        for field in IDENTIFIER_FIELDS:
+            identifier = normalize_identifier(extracted.get(field))
+            positions.update(self._by_identifier.get(identifier, []))
+        return [self.records[position] for position in sorted(positions)]
+
+    def match(self, extracted: dict) -> tuple[Optional[dict], list[dict]]:
+        """
+        The one record the credential resolves to, along with every candidate
+        its identifier pointed at. Every name / issue date / expiry date the
+        credential carries has to be readable and equal to that record's, and
+        at least one of name and issue date has to be there to confirm the
+        identifier. Anything less is left to the LLM.
+        """
+        candidates = self.candidates(extracted)
+        if not candidates:
+            return None, candidates
+
+        details = {}
+        for key, (fields, normalize) in CONFIRMING_FIELDS.items():
+            raw = next((extracted[f] for f in fields if present(extracted.get(f))), None)
+            if raw is None:
+                continue
+            details[key] = normalize(raw)
+            # Unreadable, e.g. a date in a format we do not know
+            if not details[key]:
+                return None, candidates
+
+        if "name" not in details and "issue_date" not in details:
+            return None, candidates
+
+        agreeing = [
+            record
+            for record in candidates
+            if all(record[key] == value for key, value in details.items())
+        ]
+        return (agreeing[0] if len(agreeing) == 1 else None), candidates
+
+
+def build_registry_index() -> RegistryIndex:
+    index = RegistryIndex()
+    for record_id, text in iter_registry_records():
+        index.add(record_id, json.loads(text), text)
+    return index
+
+
+_registry_index: Optional[RegistryIndex] = None
+
+
+def init_registry_index() -> RegistryIndex:
+    global _registry_index
+
+    _registry_index = build_registry_index()
+    logging.info(f"Registry index built ({len(_registry_index)} records)")
+    return _registry_index
+
+
+def get_registry_index() -> RegistryIndex:
+    if _registry_index is None:
+        return init_registry_index()
+    return _registry_index
@@ -0,0 +1,405 @@
+# utils/vector_store.py
+import os
+import asyncio
+import json
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.config import main as config
+
+
+class VectorStore(ABC):
+    """
+    Common interface for the reference registry similarity search.
+    """
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        content_hashes: Optional[List[str]] = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        pass
+
+    @abstractmethod
+    def all_ids(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def content_hashes(self, ids: List[str]) -> dict[str, str]:
+        """
+        Content hash stored with each of `ids` at its last upsert, if any.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, embedding: List[float], limit: int = 5) -> List[dict]:
+        pass
+
+    def search_batch(
+        self, embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[dict]]:
+        return [self.search(embedding, limit) for embedding in embeddings]
+
+    async def asearch(self, embedding: List[float], limit: int = 5) -> List[dict]:
+        # In-process backends answer in microseconds, so no need to leave the loop
+        return self.search(embedding, limit)
+
+    async def asearch_batch(
+        self, embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[dict]]:
+        return self.search_batch(embeddings, limit)
+
+    def __len__(self) -> int:
+        return 0
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process index backed by a contiguous float32 matrix of unit vectors.
+    Vectors are persisted to `<path>.npy` and memory-mapped on load, the
+    ids / texts live next to it in `<path>.json`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint = ""
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._hashes: List[str] = []
+        self._positions: dict[str, int] = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def load(self) -> bool:
+        if not (
+            os.path.exists(self.path + ".npy") and os.path.exists(self.path + ".json")
+        ):
+            return False
+
+        with open(self.path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self._matrix = np.load(self.path + ".npy", mmap_mode="r")
+        self._ids = meta["ids"]
+        self._texts = meta["texts"]
+        self._hashes = meta.get("hashes") or [""] * len(self._ids)
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self.fingerprint = meta.get("fingerprint", "")
+        return True
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Written aside and swapped in, the current matrix may be mapped from the
+        # file being replaced
+        with open(self.path + ".npy.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self._matrix))
+        os.replace(self.path + ".npy.tmp", self.path + ".npy")
+
+        with open(self.path + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "fingerprint": self.fingerprint,
+                    "ids": self._ids,
+                    "texts": self._texts,
+                    "hashes": self._hashes,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(self.path + ".json.tmp", self.path + ".json")
+
+    def upsert(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        content_hashes: Optional[List[str]] = None,
+    ) -> None:
+        vectors = self._normalize(embeddings)
+        content_hashes = content_hashes or [""] * len(ids)
+        matrix = np.array(self._matrix, dtype=np.float32)
+        if not len(self._ids):
+            matrix = np.empty((0, vectors.shape[1]), dtype=np.float32)
+
+        appended = []
+        for doc_id, text, vector, content_hash in zip(
+            ids, texts, vectors, content_hashes
+        ):
+            position = self._positions.get(doc_id)
+            if position is None:
+                self._positions[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._hashes.append(content_hash)
+                appended.append(vector)
+            else:
+                self._texts[position] = text
+                self._hashes[position] = content_hash
+                matrix[position] = vector
+
+        if appended:
+            matrix = np.vstack([matrix, np.stack(appended)])
+
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def delete(self, ids: List[str]) -> None:
+        removed = set(ids)
+        keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in removed]
+        if len(keep) == len(self._ids):
+            return
+
+        self._matrix = np.ascontiguousarray(self._matrix[keep], dtype=np.float32)
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._hashes = [self._hashes[i] for i in keep]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+
+    def all_ids(self) -> List[str]:
+        return list(self._ids)
+
+    def content_hashes(self, ids: List[str]) -> dict[str, str]:
+        return {
+            doc_id: self._hashes[self._positions[doc_id]]
+            for doc_id in ids
+            if doc_id in self._positions
+        }
+
+    def search(self, embedding: List[float], limit: int = 5) -> List[dict]:
+        return self.search_batch([embedding], limit)[0]
+
+    def search_batch(
+        self, embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[dict]]:
+        if not len(self._ids):
+            return [[] for _ in embeddings]
+
+        queries = self._normalize(np.atleast_2d(embeddings))
+        scores = queries @ self._matrix.T
+
+        limit = min(limit, scores.shape[1])
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            results.append(
+                [
+                    {
+                        "id": self._ids[i],
+                        "text": self._texts[i],
+                        "$similarity": float(row[i]),
+                    }
+                    for i in ordered
+                ]
+            )
+        return results
+
+
+# Data API writes in flight at once while upserting a chunk
+ASTRA_UPSERT_CONCURRENCY = 16
+
+
+class AstraVectorStore(VectorStore):
+    """
+    Astra DB collection with the `$vector` sort, kept as an optional backend.
+    """
+
+    def __init__(self, collection, async_collection=None):
+        self.collection = collection
+        self.async_collection = async_collection or collection.to_async()
+
+    def __len__(self) -> int:
+        return self.collection.estimated_document_count()
+
+    def upsert(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        content_hashes: Optional[List[str]] = None,
+    ) -> None:
+        content_hashes = content_hashes or [""] * len(ids)
+        documents = [
+            {
+                "_id": doc_id,
+                "id": doc_id,
+                "text": text,
+                "content_hash": content_hash,
+                "$vector": embedding,
+            }
+            for doc_id, text, embedding, content_hash in zip(
+                ids, texts, embeddings, content_hashes
+            )
+        ]
+
+        # Replaced in place, concurrently: a record is never missing for
+        # searches running meanwhile, and a failed write leaves the old one
+        with ThreadPoolExecutor(max_workers=ASTRA_UPSERT_CONCURRENCY) as pool:
+            list(pool.map(self._replace, documents))
+
+        # Copies written by earlier ingests under a generated _id, now superseded
+        self.collection.delete_many({"id": {"$in": list(ids)}, "_id": {"$nin": list(ids)}})
+
+    def _replace(self, document: dict) -> None:
+        self.collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+
+    def delete(self, ids: List[str]) -> None:
+        self.collection.delete_many({"id": {"$in": list(ids)}})
+
+    def all_ids(self) -> List[str]:
+        return [doc["id"] for doc in self.collection.find({}, projection={"id": True})]
+
+    def content_hashes(self, ids: List[str]) -> dict[str, str]:
+        documents = self.collection.find(
+            {"id": {"$in": list(ids)}}, projection={"id": True, "content_hash": True}
+        )
+        return {doc["id"]: doc.get("content_hash", "") for doc in documents}
+
+    def search(self, embedding: List[float], limit: int = 5) -> List[dict]:
+        return list(
+            self.collection.find(
+                {}, sort={"$vector": embedding}, limit=limit, include_similarity=True
+            )
+        )
+
+    async def asearch(self, embedding: List[float], limit: int = 5) -> List[dict]:
+        cursor = self.async_collection.find(
+            {}, sort={"$vector": embedding}, limit=limit, include_similarity=True
+        )
+        return await cursor.to_list()
+
+    async def asearch_batch(
+        self, embeddings: List[List[float]], limit: int = 5
+    ) -> List[List[dict]]:
+        # No multi-vector query in the Data API, send them side by side
+        return list(
+            await asyncio.gather(*(self.asearch(e, limit) for e in embeddings))
+        )
+
+
+def registry_record_id(record: dict, text: str) -> str:
+    doc_id = (
+        record.get("certificate_id")
+        or record.get("registration_number")
+        or record.get("id")
+        or record.get("license_number")
+    )
+
+    if not doc_id:
+        # Stable fallback so the same record maps to the same id across runs
+        doc_id = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    return doc_id
+
+
+def iter_registry_records() -> Iterator[tuple[str, str]]:
+    """
+    Yields every reference record from the mock registry as (id, text) pairs,
+    one registry file at a time.
+    """
+    for file_path in config.REGISTRY_FILE_PATHS:
+        if not os.path.exists(file_path):
+            logging.warning(f"Registry file not found: {file_path}")
+            continue
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        for record in records:
+            text = json.dumps(record, ensure_ascii=False)
+            yield registry_record_id(record, text), text
+
+
+def load_registry_records() -> List[tuple[str, str]]:
+    return list(iter_registry_records())
+
+
+def registry_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for file_path in config.REGISTRY_FILE_PATHS:
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+_registry_version: Optional[str] = None
+
+
+def registry_version() -> str:
+    """
+    Short fingerprint of the registry files, read once per process.
+    """
+    global _registry_version
+
+    if _registry_version is None:
+        _registry_version = registry_fingerprint()[:16]
+    return _registry_version
+
+
+def build_numpy_vector_store(path: str) -> NumpyVectorStore:
+    # Imported lazily so the store module stays usable without an embedding model
+    from backend.utils.embeddings import embedding_model_id
+    from backend.utils.ingestion import ingest_registry
+
+    store = NumpyVectorStore(path)
+    # Vectors from another embedding model are not comparable, rebuild then
+    fingerprint = f"{embedding_model_id()}:{registry_fingerprint()}"
+
+    if store.load() and store.fingerprint == fingerprint:
+        return store
+
+    # Only new or changed records are re-embedded
+    ingest_registry(store, prune=True)
+    store.fingerprint = fingerprint
+    store.save()
+
+    return store
+
+
+def build_astra_vector_store() -> AstraVectorStore:
+    from backend.config.clients import get_astra_collection, get_async_astra_collection
+
+    return AstraVectorStore(get_astra_collection(), get_async_astra_collection())
+
+
+_vector_store: Optional[VectorStore] = None
+
+
+def init_vector_store() -> VectorStore:
+    global _vector_store
+
+    if config.VECTOR_STORE_BACKEND == "astra":
+        _vector_store = build_astra_vector_store()
+    else:
+        _vector_store = build_numpy_vector_store(config.VECTOR_STORE_PATH)
+
+    return _vector_store
+
+
+def get_vector_store() -> VectorStore:
+    if _vector_store is None:
+        return init_vector_store()
+    return _vector_store
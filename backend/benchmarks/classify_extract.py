@@ -0,0 +1,118 @@
+"""
+Two-call vs single-pass classification + extraction.
+
+Runs the orchestrator over the same generated corpus once with the classifier
+and the extractor as two sequential LLM calls, and once with the combined
+structured-output call (CLASSIFY_EXTRACT_SINGLE_PASS). Reports end-to-end
+latency, the time spent in the CLASSIFIER + EXTRACTOR nodes, and LLM calls /
+tokens per request.
+
+    python -m benchmarks.classify_extract --requests 32 --concurrency 4
+
+Every credential is unique and the response cache is off, so each request
+pays for its own LLM calls. Token counts come from the fake model (about four
+characters per token); Gemini also counts the function schema of the
+structured-output call as prompt tokens, which these numbers leave out.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.fakes import CORPUS_FORMATS, install_fakes
+from benchmarks.pipeline import build_request, percentile
+from backend.config import main as config
+from backend.controller.agent import orchestrator
+
+MODES = {"two-call": False, "single-pass": True}
+
+
+async def one_request(index: int, fmt: str) -> dict:
+    file_paths, uploads = build_request(index, fmt, cold=True)
+
+    start = time.perf_counter()
+    result = await orchestrator(file_paths, uploads)
+    latency = time.perf_counter() - start
+
+    timings = result["timings"]
+    nodes = timings["nodes"]
+    return {
+        "latency": latency,
+        "classify_extract": sum(
+            nodes[name]["duration"] for name in ("CLASSIFIER", "EXTRACTOR") if name in nodes
+        ),
+        **timings["llm"],
+    }
+
+
+async def run_mode(single_pass: bool, args) -> dict:
+    config.CLASSIFY_EXTRACT_SINGLE_PASS = single_pass
+    semaphore = asyncio.Semaphore(args.concurrency)
+    formats = args.formats
+
+    async def bounded(index: int) -> dict:
+        async with semaphore:
+            return await one_request(index, formats[index % len(formats)])
+
+    # Warm up compiled graphs and the thread pools
+    await one_request(-1, formats[0])
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(bounded(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies = [sample["latency"] for sample in samples]
+    stages = [sample["classify_extract"] for sample in samples]
+    return {
+        "rps": args.requests / wall,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "classify_extract_p50": percentile(stages, 50),
+        **{
+            key: statistics.mean(sample[key] for sample in samples)
+            for key in ("calls", "prompt_tokens", "completion_tokens")
+        },
+    }
+
+
+async def run(args) -> dict:
+    return {name: await run_mode(single_pass, args) for name, single_pass in MODES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--formats", default="txt")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    args.formats = args.formats.split(",")
+    unknown = set(args.formats) - set(CORPUS_FORMATS)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+
+    config.LLM_CACHE_TTL, config.LLM_CACHE_AGENT_TTLS = 0, {}
+    install_fakes(args.llm_latency, args.embedding_latency)
+    results = asyncio.run(run(args))
+
+    print(
+        f"\nrequests={args.requests} concurrency={args.concurrency} "
+        f"llm_latency={args.llm_latency * 1e3:.0f} ms"
+    )
+    print(
+        f"  {'mode':<14}{'rps':>8}{'p50':>12}{'p95':>12}{'classify+extract':>20}"
+        f"{'llm calls':>12}{'prompt tok':>12}{'compl. tok':>12}"
+    )
+    for name, mode in results.items():
+        print(
+            f"  {name:<14}{mode['rps']:>8.2f}{mode['p50'] * 1e3:>9.1f} ms"
+            f"{mode['p95'] * 1e3:>9.1f} ms{mode['classify_extract_p50'] * 1e3:>17.1f} ms"
+            f"{mode['calls']:>12.1f}{mode['prompt_tokens']:>12.0f}"
+            f"{mode['completion_tokens']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
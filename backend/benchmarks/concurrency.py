@@ -0,0 +1,66 @@
+"""
+Checks that parallel pipeline runs overlap instead of queueing on the event loop.
+
+Runs the orchestrator once, then N times concurrently, against the offline
+fakes, and reports the wall time of both plus the worst event loop stall.
+The LLM response cache is off, otherwise the parallel runs would all be
+answered from what the first run stored.
+
+    python -m benchmarks.concurrency --parallel 10 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from benchmarks.fakes import install_fakes, write_text_corpus
+from backend.config import main as config
+from backend.controller.agent import orchestrator
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(parallel: int, file_paths: dict[str, str]) -> None:
+    start = time.perf_counter()
+    await orchestrator(file_paths=file_paths)
+    single = time.perf_counter() - start
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(orchestrator(file_paths=file_paths) for _ in range(parallel))
+    )
+    concurrent = time.perf_counter() - start
+
+    stop.set()
+    stall = await watcher
+
+    print(f"1 run:            {single:.3f} s")
+    print(f"{parallel} parallel runs: {concurrent:.3f} s ({concurrent / single:.2f}x)")
+    print(f"worst loop stall: {stall * 1e3:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parallel", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    config.LLM_CACHE_TTL, config.LLM_CACHE_AGENT_TTLS = 0, {}
+    install_fakes(args.llm_latency, args.embedding_latency)
+    file_paths = write_text_corpus(tempfile.mkdtemp())
+    asyncio.run(run(args.parallel, file_paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Deterministic stand-ins for Gemini and the embedding model so the pipeline can
+be exercised offline. Installed into the shared client registry by `install_fakes`.
+"""
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+from langchain_core.messages import AIMessage
+
+from backend.config import clients
+from backend.config import main as config
+from backend.utils import vector_store
+from backend.utils.embeddings import LocalEmbeddings
+from backend.utils.vector_store import NumpyVectorStore, load_registry_records
+
+LICENSE_RECORD = {
+    "name": "Tejas Cherian",
+    "license_number": "2002/05/8054",
+    "registered_under": "Karnataka Medical Council",
+    "study": "MD",
+    "university": "Kerala University of Health Sciences",
+    "issued_on": "19/03/2018",
+    "valid_till": "18/03/2023",
+}
+
+RESUME_TEXT = """Dr. Tejas Cherian, MD
+Karnataka Medical Council registration 2002/05/8054 (issued 19/03/2018)
+Education: MD, Kerala University of Health Sciences
+Experience: Consultant Physician, 2018 - present
+"""
+
+
+def _extracted_fields() -> dict:
+    return {
+        "name": LICENSE_RECORD["name"],
+        "license_number": LICENSE_RECORD["license_number"],
+        "issue_date": LICENSE_RECORD["issued_on"],
+        "expiry_date": LICENSE_RECORD["valid_till"],
+        "institution": LICENSE_RECORD["university"],
+        "certifying_body": LICENSE_RECORD["registered_under"],
+    }
+
+
+def _respond(prompt: str) -> str:
+    if "and extract its credential information" in prompt:
+        return json.dumps({"document_type": "medical_license", **_extracted_fields()})
+    if "Classify the type of this medical document" in prompt:
+        return "medical_license"
+    if "Extract the following credential information" in prompt:
+        return json.dumps(_extracted_fields())
+    if "verifying the validity of a medical credential" in prompt:
+        return json.dumps({"status": "valid"})
+    if "expert medical document auditor" in prompt:
+        return json.dumps(
+            {
+                "consistency_report": {
+                    "name_match": True,
+                    "license_number_match": True,
+                    "institution_match": True,
+                    "certifying_body_match": True,
+                    "issue_date_match": True,
+                    "expiry_date_match": False,
+                },
+                "discrepancies": ["Expiry date is not mentioned in the resume"],
+            }
+        )
+    if "medical credential assessment agent" in prompt:
+        return json.dumps(
+            {
+                "credibility_score": 85,
+                "summary": "Credential verified against the registry.",
+                "flag": "green",
+                "discrepancies": [],
+            }
+        )
+    return "{}"
+
+
+class FakeChatModel:
+    """
+    Mimics the `ChatGoogleGenerativeAI` calls the agents make, with a fixed
+    latency per call and canned JSON answers picked from the prompt.
+    """
+
+    model = "fake-gemini"
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+
+    def _message(self, prompt: str) -> AIMessage:
+        self.calls += 1
+        content = _respond(prompt)
+        input_tokens = len(prompt) // 4
+        output_tokens = len(content) // 4
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def invoke(self, prompt: str) -> AIMessage:
+        time.sleep(self.latency)
+        return self._message(prompt)
+
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        await asyncio.sleep(self.latency)
+        return self._message(prompt)
+
+    def with_structured_output(self, schema, include_raw: bool = False):
+        return FakeStructuredModel(self, schema, include_raw)
+
+
+class FakeStructuredModel:
+    """
+    What `with_structured_output` returns: the canned JSON answer parsed into
+    `schema`, next to the raw message when `include_raw` is set.
+    """
+
+    def __init__(self, llm: FakeChatModel, schema, include_raw: bool):
+        self.llm = llm
+        self.schema = schema
+        self.include_raw = include_raw
+
+    async def ainvoke(self, prompt: str):
+        raw = await self.llm.ainvoke(prompt)
+        try:
+            parsed, error = self.schema.model_validate_json(raw.content), None
+        except ValueError as e:
+            parsed, error = None, e
+
+        if not self.include_raw:
+            if error is not None:
+                raise error
+            return parsed
+        return {"raw": raw, "parsed": parsed, "parsing_error": error}
+
+
+class FakeEmbeddings(LocalEmbeddings):
+    """
+    The offline embedding backend with an artificial per-call latency.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    def embed_query(self, text: str, **kwargs) -> list[float]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    def embed_documents(self, texts: list[str], **kwargs) -> list[list[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str, **kwargs) -> list[float]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: list[str], **kwargs) -> list[list[float]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+
+def install_fakes(llm_latency: float = 0.2, embedding_latency: float = 0.05):
+    # Keeps fake vectors out of the real embedding cache entries
+    config.EMBEDDING_BACKEND = "benchmark"
+
+    llm = FakeChatModel(llm_latency)
+    embeddings = FakeEmbeddings(embedding_latency)
+    clients._clients.update({"llm": llm, "embeddings": embeddings})
+
+    records = load_registry_records()
+    store = NumpyVectorStore(os.path.join(tempfile.mkdtemp(), "registry_index"))
+    store.upsert(
+        [doc_id for doc_id, _ in records],
+        [text for _, text in records],
+        [embeddings._embed(text) for _, text in records],
+    )
+    vector_store._vector_store = store
+
+    return llm, embeddings
+
+
+def write_text_corpus(directory: str) -> dict[str, str]:
+    credential_path = os.path.join(directory, "licence.txt")
+    resume_path = os.path.join(directory, "resume.txt")
+
+    with open(credential_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(licence_lines()))
+    with open(resume_path, "w", encoding="utf-8") as f:
+        f.write(RESUME_TEXT)
+
+    return {"credential_path": credential_path, "resume_path": resume_path}
+
+
+def licence_lines(nonce: str = "") -> list[str]:
+    lines = ["MEDICAL REGISTRATION CERTIFICATE"]
+    lines += [f"{k}: {v}" for k, v in LICENSE_RECORD.items()]
+    if nonce:
+        # Makes the bytes unique so the text / embedding caches miss
+        lines.append(f"Reference: {nonce}")
+    return lines
+
+
+def licence_pdf(nonce: str = "", pages: int = 1) -> bytes:
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), "\n".join(licence_lines(nonce)), fontsize=11)
+    return doc.tobytes()
+
+
+def licence_image(nonce: str = "") -> bytes:
+    image = Image.new("L", (1240, 600), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(licence_lines(nonce)):
+        draw.text((40, 40 + i * 40), line, fill=0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def licence_text(nonce: str = "") -> bytes:
+    return "\n".join(licence_lines(nonce)).encode("utf-8")
+
+
+# Credential generators by file extension
+CORPUS_FORMATS = {"txt": licence_text, "pdf": licence_pdf, "png": licence_image}
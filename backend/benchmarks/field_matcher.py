@@ -0,0 +1,93 @@
+"""
+Decisions and speed of the local cross-check matcher on labelled cases.
+
+Scores credential values against a sample resume and checks that each lands
+on the expected side of CROSSCHECK_MATCH_SCORE / CROSSCHECK_MISMATCH_SCORE:
+"match" and "mismatch" are settled locally, "ambiguous" goes to the LLM.
+Exits with 1 when any case is decided differently.
+
+    python -m benchmarks.field_matcher --iterations 200
+"""
+import argparse
+import sys
+import time
+
+from backend.config import main as config
+from backend.utils.field_matcher import ResumeIndex, SCORERS
+
+RESUME = """Dr. Priya Raman, MBBS, MD (Internal Medicine)
+Education: MBBS, All India Institute of Medical Sciences (2009-2014).
+MD, Kerala University of Health Sciences, graduated in 2017.
+Licensure: Massachusetts Board of Registration in Medicine, licence 276345.
+Karnataka Medical Council registration 2002/05/8054, issued 19/03/2018
+Experience: Consultant Physician, Boston General Hospital, 2018 - present
+"""
+
+# (consistency_report key, credential value, expected decision)
+CASES = [
+    ("name_match", "Dr. Priya Raman", "match"),
+    ("name_match", "Anil Kumar", "mismatch"),
+    ("license_number_match", "2002-05-8054", "match"),
+    ("license_number_match", "9911/22/0001", "mismatch"),
+    ("institution_match", "All India Institute of Medical Sciences", "match"),
+    ("institution_match", "AIIMS", "match"),
+    ("institution_match", "Kerala University of Health Sciences", "match"),
+    ("institution_match", "Kerala University", "match"),
+    ("institution_match", "Harvard Medical School", "mismatch"),
+    ("certifying_body_match", "Karnataka Medical Council", "match"),
+    ("certifying_body_match", "Massachusetts Board of Registration in Medicine", "match"),
+    # Only "India" / "Board" occur, as parts of other names
+    ("certifying_body_match", "Medical Council of India", "ambiguous"),
+    ("certifying_body_match", "Board", "ambiguous"),
+    ("certifying_body_match", "Tamil Nadu Medical Council", "mismatch"),
+    ("issue_date_match", "19/03/2018", "match"),
+    # Only the year is in the resume
+    ("issue_date_match", "2014-06-30", "ambiguous"),
+    ("issue_date_match", "2017", "ambiguous"),
+    ("expiry_date_match", "2031-01-01", "mismatch"),
+]
+
+
+def decide(score: float, match: float, mismatch: float) -> str:
+    if score >= match:
+        return "match"
+    if score < mismatch:
+        return "mismatch"
+    return "ambiguous"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    match, mismatch = config.CROSSCHECK_MATCH_SCORE, config.CROSSCHECK_MISMATCH_SCORE
+    resume = ResumeIndex(RESUME)
+
+    failures = 0
+    print(f"  {'field':<24}{'value':<50}{'score':>7}  decision")
+    for key, value, expected in CASES:
+        score = SCORERS[key](value, resume)
+        decision = decide(score, match, mismatch)
+        wrong = decision != expected
+        failures += wrong
+        print(
+            f"  {key:<24}{value:<50}{score:>7.3f}  {decision}"
+            f"{f'  EXPECTED {expected}' if wrong else ''}"
+        )
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        resume = ResumeIndex(RESUME)
+        for key, value, _ in CASES:
+            SCORERS[key](value, resume)
+    elapsed = (time.perf_counter() - start) / args.iterations
+    print(f"\n{len(CASES)} fields against one resume: {elapsed * 1e3:.2f} ms")
+
+    if failures:
+        print(f"{failures} of {len(CASES)} cases decided differently")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Per-request graph build/compile cost before and after the graph registry.
+
+Run from the `backend/` directory (needs a local.env like the server):
+
+    python -m benchmarks.graph_compile --iterations 200
+"""
+import argparse
+import time
+
+from backend.controller.graphs import _builders, get_graph, init_graphs
+
+# Importing the orchestrator registers every agent graph builder
+import backend.controller.agent  # noqa: F401
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    init_graphs()
+
+    print(f"{'graph':<26}{'build+compile':>16}{'registry':>14}")
+    rebuild_total = 0.0
+    shared_total = 0.0
+    for name, builder in _builders.items():
+        rebuild = time_per_call(builder, args.iterations)
+        shared = time_per_call(lambda: get_graph(name), args.iterations)
+        rebuild_total += rebuild
+        shared_total += shared
+        print(f"{name:<26}{rebuild * 1e3:>13.3f} ms{shared * 1e6:>11.3f} us")
+
+    # Every /api/run-agent call used to build all six graphs
+    print(
+        f"{'per request':<26}{rebuild_total * 1e3:>13.3f} ms{shared_total * 1e6:>11.3f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
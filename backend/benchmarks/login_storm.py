@@ -0,0 +1,113 @@
+"""
+Latency of a cheap endpoint while a burst of sign-ins checks bcrypt passwords.
+
+Compares bcrypt run inline in the handler (the old signin) with the password
+pool, serving both through an in-process ASGI app:
+
+    python -m benchmarks.login_storm --logins 50 --pings 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+
+from backend.config import main as config
+from backend.security.password import check_password, password_queue_depth
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/signin-inline")
+    async def signin_inline():
+        return {"ok": bcrypt.checkpw(PASSWORD.encode("utf-8"), hashed.encode("utf-8"))}
+
+    @app.post("/signin-pooled")
+    async def signin_pooled():
+        return {"ok": await check_password(PASSWORD, hashed)}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def measure(client: httpx.AsyncClient, path: str, logins: int, pings: int) -> dict:
+    latencies = []
+    max_depth = 0
+    done = asyncio.Event()
+
+    async def ping_loop(interval: float = 0.005):
+        nonlocal max_depth
+        # Latency counts from when the ping was due, so time spent waiting for
+        # a blocked loop to get to it is included
+        due = time.perf_counter()
+        while len(latencies) < pings or not done.is_set():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await client.get("/ping")
+            latencies.append(time.perf_counter() - due)
+            max_depth = max(max_depth, password_queue_depth())
+            due = max(due + interval, time.perf_counter())
+
+    async def storm():
+        await asyncio.gather(*(client.post(path) for _ in range(logins)))
+        done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(ping_loop(), storm())
+    return {
+        "wall": time.perf_counter() - start,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "max_depth": max_depth,
+    }
+
+
+async def run(logins: int, pings: int) -> None:
+    hashed = bcrypt.hashpw(
+        PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
+    ).decode("utf-8")
+    transport = httpx.ASGITransport(app=build_app(hashed))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = await measure(client, "/ping", 0, pings)
+        print(
+            f"rounds={config.BCRYPT_ROUNDS} workers={config.PASSWORD_HASH_WORKERS} "
+            f"logins={logins} pings={pings}"
+        )
+        print(f"{'mode':<10}{'wall':>10}{'ping p50':>12}{'ping p99':>12}{'queue':>8}")
+        print(
+            f"{'idle':<10}{baseline['wall']:>8.2f} s{baseline['p50'] * 1e3:>9.2f} ms"
+            f"{baseline['p99'] * 1e3:>9.2f} ms{'-':>8}"
+        )
+        for mode in ("inline", "pooled"):
+            result = await measure(client, f"/signin-{mode}", logins, pings)
+            print(
+                f"{mode:<10}{result['wall']:>8.2f} s{result['p50'] * 1e3:>9.2f} ms"
+                f"{result['p99'] * 1e3:>9.2f} ms{result['max_depth']:>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--pings", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins, args.pings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+OCR time per page and character accuracy, raw Tesseract vs the preprocessed
+OCR subsystem, over a generated corpus of phone-photo-like licence images.
+
+Needs the tesseract binary on PATH:
+
+    python -m benchmarks.ocr --psm 3 --psm 6
+"""
+import argparse
+import difflib
+import io
+import shutil
+import sys
+import time
+
+import numpy as np
+import pytesseract
+from PIL import Image, ImageFilter
+
+from benchmarks.fakes import licence_image, licence_lines
+from backend.config import main as config
+from backend.utils import ocr
+
+
+def phone_photo(data: bytes, scale: float, angle: float, noise: float, seed: int) -> Image.Image:
+    """
+    Upscaled, slightly rotated, blurred and noisy grey copy of a clean render.
+    """
+    image = Image.open(io.BytesIO(data)).convert("L")
+    image = image.resize((int(image.width * scale), int(image.height * scale)))
+    image = image.rotate(angle, expand=True, fillcolor=235, resample=Image.BICUBIC)
+    image = image.filter(ImageFilter.GaussianBlur(scale / 2))
+
+    pixels = np.asarray(image, dtype=np.float32) * 0.85 + 20
+    pixels += np.random.default_rng(seed).normal(0, noise, pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).convert("RGB")
+
+
+CORPUS = [
+    ("clean", 1.0, 0.0, 0.0),
+    ("phone 3x", 3.0, 0.0, 8.0),
+    ("phone 3x skew 2", 3.0, 2.0, 8.0),
+    ("phone 4x skew -4", 4.0, -4.0, 12.0),
+]
+
+
+def accuracy(expected: str, actual: str) -> float:
+    normalize = lambda text: " ".join(text.split()).lower()
+    return difflib.SequenceMatcher(None, normalize(expected), normalize(actual)).ratio()
+
+
+def measure(fn, image: Image.Image, expected: str, iterations: int) -> tuple[float, float]:
+    text = fn(image)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(image)
+    return (time.perf_counter() - start) / iterations, accuracy(expected, text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--psm", type=int, action="append")
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    if not shutil.which("tesseract"):
+        sys.exit("tesseract is not installed or not on PATH")
+
+    expected = "\n".join(licence_lines())
+    clean = licence_image()
+
+    print(f"{'image':<20}{'size':>12}{'psm':>5}{'raw':>18}{'preprocessed':>22}")
+    for psm in args.psm or [config.OCR_PSM]:
+        config.OCR_PSM = psm
+        for seed, (name, scale, angle, noise) in enumerate(CORPUS):
+            image = phone_photo(clean, scale, angle, noise, seed)
+
+            raw_time, raw_accuracy = measure(
+                pytesseract.image_to_string, image, expected, args.iterations
+            )
+            new_time, new_accuracy = measure(
+                lambda page: ocr.ocr_pages([page]), image, expected, args.iterations
+            )
+            size = f"{image.width}x{image.height}"
+            print(
+                f"{name:<20}{size:>12}{psm:>5}"
+                f"{raw_time * 1e3:>9.0f} ms {raw_accuracy:>6.1%}"
+                f"{new_time * 1e3:>13.0f} ms {new_accuracy:>6.1%}"
+            )
+
+    ocr.shutdown_ocr()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+PDF text extraction time, serial page loop vs the page-parallel engine.
+
+    python -m benchmarks.pdf_extraction --pages 40 --workers 4
+"""
+import argparse
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.fakes import licence_pdf
+from backend.config import main as config
+from backend.utils.pdf import extract_pdf_text, shutdown_pdf_pool
+
+
+def serial_extract(data: bytes) -> str:
+    # What extract_text_from_pdf used to do
+    doc = fitz.open(stream=data, filetype="pdf")
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    return text.strip()
+
+
+def time_per_call(fn, data: bytes, iterations: int) -> float:
+    fn(data)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(data)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=config.PDF_WORKERS)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    config.PDF_WORKERS = args.workers
+    config.PDF_MAX_PAGES = max(config.PDF_MAX_PAGES, args.pages)
+    data = licence_pdf(pages=args.pages)
+
+    serial = time_per_call(serial_extract, data, args.iterations)
+    engine = time_per_call(extract_pdf_text, data, args.iterations)
+    shutdown_pdf_pool()
+
+    print(f"{args.pages} pages, {args.workers} workers")
+    print(f"serial loop: {serial * 1e3:9.2f} ms")
+    print(f"engine:      {engine * 1e3:9.2f} ms ({serial / engine:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Offline throughput / latency benchmark for the full credential pipeline.
+
+Runs the orchestrator against the fake LLM / embeddings and a registry index
+seeded from `mock/*.json`, over a generated corpus of credentials, at several
+concurrency levels. Reports requests/sec, latency percentiles and a per-stage
+breakdown (graph nodes, inner steps, extraction and persistence).
+
+    python -m benchmarks.pipeline --concurrency 1,4,16 --requests 64 --formats txt,pdf
+    python -m benchmarks.pipeline --save baseline.json
+    python -m benchmarks.pipeline --compare baseline.json --tolerance 0.2
+
+`--cold` makes every credential unique so the text and embedding caches miss.
+`--no-llm-cache` sends every prompt to the fake LLM, as repeated runs of the
+same corpus would otherwise be answered from the response cache.
+Without `--mongo-uri` persistence is measured as building and BSON-encoding
+the ReportHistory document; with it reports are really saved (and removed).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import shutil
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import bson
+from beanie import PydanticObjectId
+from beanie.odm.utils.encoder import Encoder
+
+from benchmarks.fakes import CORPUS_FORMATS, RESUME_TEXT, install_fakes
+from backend.config import main as config
+from backend.constants.enums import ReportStatus
+from backend.controller.agent import orchestrator
+from backend.models.ReportHistory import ReportHistory
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def build_upload(name: str, data: bytes) -> dict:
+    return {"data": data, "sha256": hashlib.sha256(data).hexdigest(), "name": name}
+
+
+def build_request(index: int, fmt: str, cold: bool) -> tuple[dict, dict]:
+    nonce = f"bench-{index}-{time.time_ns()}" if cold else ""
+    credential = build_upload(f"licence.{fmt}", CORPUS_FORMATS[fmt](nonce))
+    resume = build_upload("resume.txt", (RESUME_TEXT + nonce).encode("utf-8"))
+
+    # Only the extension of the path matters, the bytes are passed inline
+    file_paths = {"credential_path": credential["name"], "resume_path": resume["name"]}
+    return file_paths, {"credential_path": credential, "resume_path": resume}
+
+
+async def persist(result: dict, mongo: bool) -> None:
+    report = (ReportHistory if mongo else ReportHistory.model_construct)(
+        user_id=PydanticObjectId(),
+        report_id=str(PydanticObjectId()),
+        credential_type=result["formatted_response"]["classifier_result"],
+        credential_path="",
+        validator_type="",
+        validator_path="",
+        result=result["formatted_response"],
+        timings=result["timings"],
+        status=ReportStatus.COMPLETED,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+    if mongo:
+        await report.save()
+        return
+
+    fields = {name: getattr(report, name) for name in ReportHistory.model_fields}
+    bson.encode(Encoder(to_db=True).encode(fields))
+
+
+async def one_request(index: int, fmt: str, args) -> dict:
+    file_paths, uploads = build_request(index, fmt, args.cold)
+
+    start = time.perf_counter()
+    result = await orchestrator(file_paths, uploads)
+    persist_start = time.perf_counter()
+    await persist(result, args.mongo_uri is not None)
+    end = time.perf_counter()
+
+    timings = result["timings"]
+    stages = {f"node.{name}": t["duration"] for name, t in timings["nodes"].items()}
+    stages.update({f"step.{name}": seconds for name, seconds in timings["steps"].items()})
+    stages["extraction"] = timings["extraction_seconds"]
+    stages["retrieval"] = timings["retrieval_seconds"]
+    stages["persistence"] = end - persist_start
+
+    return {"latency": end - start, "stages": stages}
+
+
+async def run_level(concurrency: int, args) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    formats = args.formats
+
+    async def bounded(index: int) -> dict:
+        async with semaphore:
+            return await one_request(index, formats[index % len(formats)], args)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(bounded(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies = [sample["latency"] for sample in samples]
+    stages = defaultdict(list)
+    for sample in samples:
+        for name, seconds in sample["stages"].items():
+            stages[name].append(seconds)
+
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "rps": args.requests / wall,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "stages": {
+            name: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+            for name, values in sorted(stages.items())
+        },
+    }
+
+
+def print_level(level: dict) -> None:
+    print(
+        f"\nconcurrency={level['concurrency']} requests={level['requests']} "
+        f"rps={level['rps']:.2f} p50={level['p50'] * 1e3:.1f} ms "
+        f"p95={level['p95'] * 1e3:.1f} ms p99={level['p99'] * 1e3:.1f} ms"
+    )
+    print(f"  {'stage':<40}{'p50':>12}{'p95':>12}")
+    for name, stage in level["stages"].items():
+        print(f"  {name:<40}{stage['p50'] * 1e3:>9.2f} ms{stage['p95'] * 1e3:>9.2f} ms")
+
+
+def compare(levels: list[dict], baseline_path: str, tolerance: float) -> bool:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+    ok = True
+    print(f"\nagainst {baseline_path} (tolerance {tolerance:.0%}):")
+    for level in levels:
+        previous = baseline.get(level["concurrency"])
+        if previous is None:
+            continue
+
+        for metric in ("p95", "p99"):
+            change = level[metric] / previous[metric] - 1
+            regressed = change > tolerance
+            ok = ok and not regressed
+            print(
+                f"  c={level['concurrency']:<4}{metric} {previous[metric] * 1e3:>9.1f} ms"
+                f" -> {level[metric] * 1e3:>9.1f} ms ({change:+.0%})"
+                f"{'  REGRESSION' if regressed else ''}"
+            )
+    return ok
+
+
+async def run(args) -> list[dict]:
+    if args.mongo_uri:
+        from beanie import init_beanie
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(args.mongo_uri)
+        await init_beanie(database=client["benchmark"], document_models=[ReportHistory])
+
+    # Warm up compiled graphs, the registry index and the thread pools
+    await one_request(-1, args.formats[0], args)
+
+    levels = []
+    for concurrency in args.concurrency:
+        level = await run_level(concurrency, args)
+        print_level(level)
+        levels.append(level)
+
+    if args.mongo_uri:
+        await client["benchmark"].drop_collection(ReportHistory.get_collection_name())
+        client.close()
+
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--formats", default="txt,pdf")
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--no-llm-cache", action="store_true")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.formats = args.formats.split(",")
+    if "png" in args.formats and not shutil.which("tesseract"):
+        parser.error("the png corpus needs the tesseract binary on PATH")
+
+    if args.no_llm_cache:
+        config.LLM_CACHE_TTL, config.LLM_CACHE_AGENT_TTLS = 0, {}
+
+    install_fakes(args.llm_latency, args.embedding_latency)
+    levels = asyncio.run(run(args))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": sys.argv[1:], "levels": levels}, f, indent=2)
+
+    if args.compare and not compare(levels, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
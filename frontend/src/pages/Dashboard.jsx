@@ -24,6 +24,7 @@ const UploadDocuments = () => {
   });
 
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   const formatClassifierResult = (result) => {
     let splitResult = result.split("_");
@@ -46,16 +47,20 @@ const UploadDocuments = () => {
     }
   };
 
-  const retrieveReportHistory = async () => {
+  const retrieveReportHistory = async (after = null) => {
     try {
       const token = localStorage.getItem("accessToken");
       const response = await axios.get("/report-history-list", {
         baseURL: config.API_URL,
         headers: { Authorization: `Bearer ${token}` },
+        params: after ? { after } : {},
       });
 
       if (response.data.success) {
-        setReports(response.data.result);
+        setReports((prev) =>
+          after ? [...prev, ...response.data.result] : response.data.result
+        );
+        setNextCursor(response.data.next_cursor);
       }
     } catch (error) {
       console.log(error);
@@ -70,6 +75,26 @@ const UploadDocuments = () => {
     }
   }, []);
 
+  const pollReport = async (reportId, status) => {
+    const token = localStorage.getItem("accessToken");
+
+    while (true) {
+      // Resubmitted files come back with the earlier, completed report
+      if (status !== "completed") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+      }
+      const response = await axios.get(`/report/${reportId}`, {
+        baseURL: config.API_URL,
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      const report = response.data.result;
+      if (report.status === "completed" || report.status === "failed") {
+        return report;
+      }
+      status = report.status;
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
 
@@ -92,16 +117,29 @@ const UploadDocuments = () => {
           Authorization: `Bearer ${token}`,
         },
       });
-      setMessage("Upload successful!");
+      setMessage("Upload successful! Analysing documents...");
+      await retrieveReportHistory();
+
+      const report = await pollReport(
+        response.data.result.report_id,
+        response.data.result.status
+      );
       setIsLoading(false);
-      if (response.data.success) {
-        setResult(response.data.result);
+      if (report.status === "completed") {
+        setMessage("");
+        setResult(report.result);
+      } else {
+        setMessage("Analysis failed. Please try again.");
       }
       await retrieveReportHistory();
     } catch (error) {
       setIsLoading(false);
       console.error("Upload failed:", error);
-      setMessage("Upload failed. Please try again.");
+      setMessage(
+        error.response?.status === 503
+          ? "Server is busy. Please try again shortly."
+          : "Upload failed. Please try again."
+      );
     }
   };
 
@@ -120,7 +158,16 @@ const UploadDocuments = () => {
     });
   };
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    try {
+      const token = localStorage.getItem("accessToken");
+      await axios.post("/signout", null, {
+        baseURL: config.API_URL,
+        headers: { Authorization: `Bearer ${token}` },
+      });
+    } catch (error) {
+      console.log(error);
+    }
     localStorage.removeItem("access_token");
     dispatch(revokeAuth({}));
   };
@@ -160,6 +207,14 @@ const UploadDocuments = () => {
                 </Link>
               ))}
             </ul>
+            {nextCursor && (
+              <button
+                onClick={() => retrieveReportHistory(nextCursor)}
+                className="w-full mt-2 text-sm text-blue-600 hover:underline"
+              >
+                Load more
+              </button>
+            )}
           </nav>
         </div>
         <div className="px-6 py-4 border-t">
@@ -26,7 +26,7 @@ const ViewReport = () => {
         }
       );
       if (response.data.success) {
-        setReport({...response.data.result.result, created_at: response.data.result.created_at});
+        setReport({...response.data.result.result, created_at: response.data.result.created_at, status: response.data.result.status});
       } else {
         setError("Failed to fetch report.");
       }
@@ -50,7 +50,16 @@ const ViewReport = () => {
       .join(" ");
   };
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    try {
+      const token = localStorage.getItem("accessToken");
+      await axios.post("/signout", null, {
+        baseURL: config.API_URL,
+        headers: { Authorization: `Bearer ${token}` },
+      });
+    } catch (error) {
+      console.log(error);
+    }
     localStorage.removeItem("access_token");
     dispatch(revokeAuth({}));
   };
@@ -113,6 +122,10 @@ const ViewReport = () => {
               <p className="text-red-600 text-center">{error}</p>
             ) : !report ? (
               <p className="text-center text-gray-600">Loading report...</p>
+            ) : report.status !== "completed" ? (
+              <p className="text-center text-gray-600">
+                Report {report_id} is {report.status}.
+              </p>
             ) : (
               <>
                 <h2 className="text-xl font-semibold text-gray-800 mb-6 text-center">